@@ -1,32 +1,97 @@
+import logging
 import os
-from flask import Flask
+import click
+from flask import Flask, current_app
+from sqlalchemy import event, text
 from .config import Config
 from .extensions import db, login_manager, socketio, csrf
 from .models import User
 from .auth import auth_bp
 from .routes import main_bp
+from .alerts import configure_timezone
 
 def create_app():
+    logging.basicConfig(
+        level=os.getenv("LOG_LEVEL", "WARNING").upper(),
+        format="[%(levelname)s] %(name)s: %(message)s",
+    )
     app = Flask(__name__, static_folder="static", template_folder="templates")
     app.config.from_object(Config())
+    configure_timezone(app.config["TIMEZONE"])
     db.init_app(app)
     login_manager.init_app(app)
     socketio.init_app(app, cors_allowed_origins="*")
     csrf.init_app(app)
     with app.app_context():
-        db.create_all()
-        _ensure_admin()
+        if db.engine.dialect.name == "sqlite":
+            event.listen(db.engine, "connect", _set_sqlite_pragmas)
+    # Production workers can set SKIP_DB_BOOTSTRAP=1 and run `flask db-init` once instead.
+    # Indexes added to existing tables are only built by `flask db-init`, never on boot.
+    if os.getenv("SKIP_DB_BOOTSTRAP", "").strip() != "1":
+        with app.app_context():
+            _bootstrap_db()
+        # `flask db-init` builds the app through create_app() too; lets it skip a second pass
+        app.extensions["db_bootstrapped"] = True
+    app.cli.command("db-init")(_db_init_command)
     app.register_blueprint(auth_bp)
     app.register_blueprint(main_bp)
     return app
 
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets readers run alongside the single writer; NORMAL sync is safe under WAL
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+def _bootstrap_db():
+    # Autocommit: the event indexes are declared CONCURRENTLY, which Postgres rejects in a transaction
+    with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        db.metadata.create_all(conn)
+    _ensure_admin()
+
+# Superseded by the composite indexes on VehicleEvent; dropped from databases created before them
+_RETIRED_EVENT_INDEXES = ("ix_vehicle_event_vehicle_number", "ix_vehicle_event_time_stamp")
+
+def _ensure_indexes():
+    # create_all() skips existing tables, so indexes added to VehicleEvent later are built
+    # here. Run once per deploy from `flask db-init`, never on worker boot: the builds can
+    # take a while on a large table and concurrent workers would race on the same DDL.
+    from .models import VehicleEvent
+    with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        online = conn.dialect.name == "postgresql"
+        if online:
+            # A failed CONCURRENTLY build leaves an INVALID index that checkfirst counts as present
+            invalid = conn.execute(
+                text(
+                    "SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid"
+                    " WHERE i.indrelid = CAST(:table AS regclass) AND NOT i.indisvalid"
+                ),
+                {"table": VehicleEvent.__tablename__},
+            ).scalars().all()
+            for name in invalid:
+                conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"'))
+        for index in VehicleEvent.__table__.indexes:
+            index.create(conn, checkfirst=True)
+        for name in _RETIRED_EVENT_INDEXES:
+            conn.execute(text(f"DROP INDEX {'CONCURRENTLY ' if online else ''}IF EXISTS {name}"))
+
+def _db_init_command():
+    """Create tables, the default admin user and any missing event indexes."""
+    if not current_app.extensions.get("db_bootstrapped"):
+        _bootstrap_db()
+    _ensure_indexes()
+    click.echo("Database initialized.")
+
 def _ensure_admin():
+    from sqlalchemy import exists
     from werkzeug.security import generate_password_hash
     from .models import User
     from .extensions import db
     username = os.getenv("ADMIN_USERNAME", "admin")
     password = os.getenv("ADMIN_PASSWORD", "admin123")
-    if not User.query.filter_by(username=username).first():
+    if not db.session.query(exists().where(User.username == username)).scalar():
         u = User(username=username, role="admin", password_hash=generate_password_hash(password))
         db.session.add(u); db.session.commit()
 
@@ -1,50 +1,139 @@
+import logging
 import os
+import time
 import requests
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import nullcontext
+from functools import lru_cache
+from threading import Lock
+from types import SimpleNamespace
+from requests.adapters import HTTPAdapter
 from datetime import datetime, timezone
 from flask import current_app
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
+try:
+    from requests_toolbelt import MultipartEncoder  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    MultipartEncoder = None
 
-def _resolve_timezone():
-    """Return timezone configured for notifications."""
-    default_tz = os.getenv("TIMEZONE", "Asia/Kolkata")
-    try:
-        app = current_app._get_current_object()
-        tz_name = app.config.get("TIMEZONE", default_tz)
-    except RuntimeError:
-        tz_name = default_tz
+log = logging.getLogger(__name__)
+
+# Telegram credentials and endpoints are read once at import (after config.py
+# has loaded .env); replace these constants to hot-reload credentials.
+_TG_TOKEN = os.getenv("TG_BOT_TOKEN")
+_TG_CHAT = os.getenv("TG_CHAT_ID")
+_TG_SEND_PHOTO_URL = f"https://api.telegram.org/bot{_TG_TOKEN}/sendPhoto"
+_TG_SEND_MSG_URL = f"https://api.telegram.org/bot{_TG_TOKEN}/sendMessage"
+
+# Shared keep-alive session so consecutive alerts reuse the TLS connection
+_TG_SESSION = requests.Session()
+_TG_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+# Keeps Telegram uploads off the detection/event hot path
+_TG_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="telegram")
+
+# Re-detections of the same plate within this window share a single alert
+_ALERT_COALESCE_SEC = float(os.getenv("ALERT_COALESCE_SEC", "10"))
+# plate -> monotonic time of its last alert, oldest first
+_RECENT_ALERTS: "OrderedDict[str, float]" = OrderedDict()
+_RECENT_ALERTS_LOCK = Lock()
+
+# Timezone name resolved from app config by `configure_timezone()` in create_app()
+_TZ_NAME = None
+
+
+def configure_timezone(tz_name):
+    """Record the notification timezone once at app start-up."""
+    global _TZ_NAME
+    _TZ_NAME = tz_name
+
+
+@lru_cache(maxsize=4)
+def _zoneinfo(tz_name):
+    if tz_name in ("UTC", "Etc/UTC"):
+        # Lets _format_event_datetime skip conversion for UTC timestamps
+        return timezone.utc
     try:
         return ZoneInfo(tz_name)
     except ZoneInfoNotFoundError:
         return datetime.now().astimezone().tzinfo or timezone.utc
 
 
+def _resolve_timezone():
+    """Return timezone configured for notifications."""
+    return _zoneinfo(_TZ_NAME or os.getenv("TIMEZONE", "Asia/Kolkata"))
+
+
+@lru_cache(maxsize=8)
+def _format_utc_offset(offset):
+    """Render a utcoffset() timedelta as '+05:30'."""
+    minutes = int(offset.total_seconds() // 60) if offset else 0
+    sign = '-' if minutes < 0 else '+'
+    hours, minutes = divmod(abs(minutes), 60)
+    return f"{sign}{hours:02d}:{minutes:02d}"
+
+
 def _format_event_datetime(event):
     """Return localized date/time strings for the event."""
+    tz = _resolve_timezone()
     ts = event.time_stamp
     if ts.tzinfo is None:
         ts = ts.replace(tzinfo=timezone.utc)
-    else:
-        ts = ts.astimezone(timezone.utc)
-    local_ts = ts.astimezone(_resolve_timezone())
+    # Naive timestamps are stored in UTC, so a UTC target needs no conversion
+    local_ts = ts if ts.tzinfo is tz else ts.astimezone(tz)
     date_str = local_ts.strftime('%Y-%m-%d')
-    offset = local_ts.strftime('%z') or '+0000'
-    offset_fmt = f"{offset[:3]}:{offset[3:]}"
-    time_str = f"{local_ts.strftime('%H:%M:%S %Z')} (UTC{offset_fmt})"
+    time_str = f"{local_ts.strftime('%H:%M:%S %Z')} (UTC{_format_utc_offset(local_ts.utcoffset())})"
     return date_str, time_str
 
+def _post_photo(url, chat_id, caption, filename, photo):
+    """Upload a photo, streaming the multipart body when requests-toolbelt is available."""
+    fields = {'chat_id': str(chat_id), 'caption': caption, 'parse_mode': 'HTML'}
+    part = (filename, photo, 'image/jpeg')
+    if MultipartEncoder is not None:
+        encoder = MultipartEncoder(fields={**fields, 'photo': part})
+        return _TG_SESSION.post(url, data=encoder, headers={'Content-Type': encoder.content_type}, timeout=15)
+    return _TG_SESSION.post(url, data=fields, files={'photo': part}, timeout=15)
+
+def _claim_alert(plate, now):
+    """Record an alert for `plate`; False if one was already sent within the window."""
+    with _RECENT_ALERTS_LOCK:
+        # Entries are only inserted after expiring, so the oldest sit at the front
+        while _RECENT_ALERTS:
+            oldest_plate, ts = next(iter(_RECENT_ALERTS.items()))
+            if now - ts < _ALERT_COALESCE_SEC:
+                break
+            _RECENT_ALERTS.popitem(last=False)
+        if plate in _RECENT_ALERTS:
+            return False
+        _RECENT_ALERTS[plate] = now
+        return True
+
+
+def _release_alert(plate):
+    """Forget a claimed alert that failed to send so the next detection retries."""
+    with _RECENT_ALERTS_LOCK:
+        _RECENT_ALERTS.pop(plate, None)
+
+
 def send_telegram(event):
     """
     Sends a Telegram alert with full vehicle information and snapshot photo.
+
+    Returns True once Telegram accepts the alert, False when it could not be
+    sent, and None when it was suppressed as a repeat of a recent alert.
     """
     try:
-        token = os.getenv("TG_BOT_TOKEN")
-        chat_id = os.getenv("TG_CHAT_ID")
-
-        if not token or not chat_id:
-            print("[WARN] Telegram credentials missing in .env")
+        chat_id = _TG_CHAT
+        if not _TG_TOKEN or not chat_id:
+            log.warning("Telegram credentials missing in .env")
             return False
 
+        if not _claim_alert(event.vehicle_number, time.monotonic()):
+            log.info("Alert for %s coalesced with one sent in the last %ss", event.vehicle_number, _ALERT_COALESCE_SEC)
+            # Nothing was sent for this event, so it must not be recorded as alerted
+            return None
+
         event_date, event_time = _format_event_datetime(event)
         # Prepare message text (caption for photo)
         msg = (
@@ -58,9 +147,20 @@ def send_telegram(event):
             f"Time: {event_time}"
         )
 
-        # Get snapshot file path
+        # In-memory JPEG from the detector skips the disk round-trip entirely
+        snapshot_bytes = getattr(event, 'snapshot_bytes', None)
+        if isinstance(snapshot_bytes, Future):
+            # Snapshot is still being written by the detector's pool
+            try:
+                snapshot_bytes = snapshot_bytes.result(timeout=5)
+            except Exception as e:
+                log.warning("Snapshot encode did not complete: %s", e)
+                snapshot_bytes = None
+
+        # Get snapshot file path; stat it once and branch on the cached result
         snapshot_path = None
-        if event.snapshot_path:
+        snapshot_ok = False
+        if event.snapshot_path and not snapshot_bytes:
             try:
                 # snapshot_path is relative like "static/snapshots/vehicle_xxx.jpg"
                 # Get the Flask app instance to access root path
@@ -79,45 +179,78 @@ def send_telegram(event):
                 snapshot_path = os.path.normpath(snapshot_path)
                 
                 # Check if file exists
-                if not os.path.exists(snapshot_path):
-                    print(f"[WARN] Snapshot file not found: {snapshot_path}")
+                snapshot_ok = os.path.exists(snapshot_path)
+                if not snapshot_ok:
+                    log.warning("Snapshot file not found: %s", snapshot_path)
                     snapshot_path = None
             except Exception as e:
-                print(f"[WARN] Error getting snapshot path: {e}")
+                log.warning("Error getting snapshot path: %s", e)
                 snapshot_path = None
 
         # Send message with photo if available, otherwise send text only
-        if snapshot_path and os.path.exists(snapshot_path):
+        if snapshot_bytes:
+            url = _TG_SEND_PHOTO_URL
+            filename = os.path.basename(event.snapshot_path or '') or 'snapshot.jpg'
+            response = _post_photo(url, chat_id, msg, filename, snapshot_bytes)
+        elif snapshot_ok:
             # Send photo with caption
-            url = f"https://api.telegram.org/bot{token}/sendPhoto"
+            url = _TG_SEND_PHOTO_URL
             try:
                 with open(snapshot_path, 'rb') as photo:
-                    files = {'photo': photo}
-                    data = {
-                        'chat_id': chat_id,
-                        'caption': msg,
-                        'parse_mode': 'HTML'
-                    }
-                    response = requests.post(url, files=files, data=data, timeout=15)
+                    response = _post_photo(url, chat_id, msg, os.path.basename(snapshot_path), photo)
             except Exception as e:
-                print(f"[ERROR] Error reading snapshot file: {e}")
+                log.error("Error reading snapshot file: %s", e)
                 # Fallback to text-only message
-                url = f"https://api.telegram.org/bot{token}/sendMessage"
+                url = _TG_SEND_MSG_URL
                 data = {"chat_id": chat_id, "text": msg}
-                response = requests.post(url, data=data, timeout=10)
+                response = _TG_SESSION.post(url, data=data, timeout=10)
         else:
             # Send text-only message if no snapshot
-            url = f"https://api.telegram.org/bot{token}/sendMessage"
+            url = _TG_SEND_MSG_URL
             data = {"chat_id": chat_id, "text": msg}
-            response = requests.post(url, data=data, timeout=10)
+            response = _TG_SESSION.post(url, data=data, timeout=10)
 
         if response.status_code == 200:
-            print(f"[INFO] Telegram alert sent for {event.vehicle_number}" + (" (with photo)" if snapshot_path else " (text only)"))
+            log.info("Telegram alert sent for %s (%s)", event.vehicle_number, "with photo" if snapshot_bytes or snapshot_path else "text only")
             return True
         else:
-            print(f"[ERROR] Telegram API failed: {response.text}")
+            log.error("Telegram API failed: %s", response.text)
+            _release_alert(event.vehicle_number)
             return False
 
     except Exception as e:
-        print(f"[ERROR] Telegram alert exception: {e}")
+        log.error("Telegram alert exception: %s", e)
+        _release_alert(event.vehicle_number)
         return False
+
+
+def send_telegram_async(event, snapshot_bytes=None) -> Future:
+    """
+    Queue `send_telegram` on a background worker and return its Future.
+
+    The event's fields are copied up front so the worker never touches the
+    ORM session of the calling thread. `snapshot_bytes`, when given, is the
+    already-encoded JPEG (or a Future of it) and is uploaded without reading
+    the file back. The Future resolves to the same value `send_telegram`
+    returns.
+    """
+    snapshot = SimpleNamespace(
+        vehicle_number=event.vehicle_number,
+        authorized_as=event.authorized_as,
+        vehicle_type=getattr(event, 'vehicle_type', 'Unknown'),
+        status=event.status,
+        confidence=event.confidence,
+        time_stamp=event.time_stamp,
+        snapshot_path=event.snapshot_path,
+        snapshot_bytes=snapshot_bytes,
+    )
+    try:
+        app = current_app._get_current_object()
+    except RuntimeError:
+        app = None
+
+    def run():
+        with app.app_context() if app else nullcontext():
+            return send_telegram(snapshot)
+
+    return _TG_EXECUTOR.submit(run)
@@ -1,10 +1,15 @@
-import cv2, threading, time, os
+import cv2, threading, os, queue, logging
+import numpy as np
 from contextlib import nullcontext
 from datetime import datetime
 from typing import List, Optional
 
 from flask import current_app
 
+from .config import Config
+
+log = logging.getLogger(__name__)
+
 try:
     from .detector import VehicleDetector, DetectionEvent
     DETECTOR_IMPORT_ERROR: Optional[Exception] = None
@@ -13,18 +18,40 @@ except Exception as exc:  # pragma: no cover - optional dependency
     DetectionEvent = None
     DETECTOR_IMPORT_ERROR = exc
 
+try:  # libjpeg-turbo SIMD encoder; falls back to cv2.imencode
+    from turbojpeg import TurboJPEG
+    _tj: Optional["TurboJPEG"] = TurboJPEG()
+except Exception:  # pragma: no cover - optional dependency
+    _tj = None
+
 
 class Camera:
     def __init__(self):
         self.cap = None
-        self.lock = threading.Lock()
+        # Guards running/cap state transitions; re-entrant as start() may call stop()
+        self.lock = threading.RLock()
+        # Held only by whoever is touching the VideoCapture (reader, open, release)
+        self._cap_lock = threading.Lock()
+        # Viewer queues fed by the single shared pipeline
+        self._subscribers: List[queue.Queue] = []
+        self._sub_lock = threading.Lock()
+        self._pipeline_stop: Optional[threading.Event] = None
         self.running = False
         self.app = None
         self.video_path: Optional[str] = None
         self.cam_index: Optional[int] = None
         self.source_label: str = "video file"
+        self.decode_threads = max(int(os.getenv('DECODE_THREADS', min(os.cpu_count() or 1, 8))), 1)
         self._configure_source()
         self.loop_video = self.cam_index is None
+        # Only decode and run detection on every Nth captured frame
+        self.detect_every_n = max(int(os.getenv('DETECT_EVERY_N', '5')), 1)
+        # Depth of the bounded queues between reader, detector and encoder stages
+        self.prefetch = max(int(os.getenv('PIPELINE_PREFETCH', '4')), 1)
+        # Upper bound on frames handed to the detector in one batched call
+        self.detect_batch = max(int(os.getenv('DETECT_BATCH', '8')), 1)
+        self.stream_size = (Config.STREAM_W, Config.STREAM_H)
+        self.stream_quality = Config.STREAM_Q
         self.detector: Optional[VehicleDetector] = None
         self.detector_error: Optional[Exception] = DETECTOR_IMPORT_ERROR
 
@@ -38,50 +65,61 @@ class Camera:
             try:
                 self.cam_index = int(env_cam)
                 self.source_label = f"webcam #{self.cam_index}"
-                print(f"[INFO] Camera configured to use webcam index {self.cam_index}")
+                log.info("Camera configured to use webcam index %s", self.cam_index)
                 return
             except ValueError:
-                print(f"[WARN] Invalid CAM_INDEX '{env_cam}'. Falling back to video file.")
+                log.warning("Invalid CAM_INDEX '%s'. Falling back to video file.", env_cam)
 
         self.video_path = os.path.abspath(env_video) if env_video else base_video
         self.source_label = os.path.basename(self.video_path)
-        print(f"[INFO] Camera configured to use video file: {self.video_path}")
+        # Must be set before the first FFmpeg capture is created
+        os.environ.setdefault('OPENCV_FFMPEG_CAPTURE_OPTIONS', f"threads;{self.decode_threads}")
+        log.info("Camera configured to use video file: %s", self.video_path)
 
     def _open(self):
         if self.cam_index is not None:
             backend = cv2.CAP_DSHOW if os.name == 'nt' else 0
-            print(f"[INFO] Opening webcam index {self.cam_index}")
+            log.info("Opening webcam index %s", self.cam_index)
             self.cap = cv2.VideoCapture(self.cam_index, backend)
             if not self.cap or not self.cap.isOpened():
                 error = f"Failed to open webcam index {self.cam_index}"
-                print(f"[ERROR] {error}")
+                log.error(error)
                 self.cap = None
                 return False, error
-            print("[INFO] Webcam opened successfully.")
+            try:
+                # Compressed MJPEG scales far better over USB than raw YUYV
+                self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+            except Exception:
+                pass
+            log.info("Webcam opened successfully.")
             return True, None
 
         if not self.video_path or not os.path.exists(self.video_path):
             error = f"Video file not found: {self.video_path}"
-            print(f"[ERROR] {error}")
+            log.error(error)
             self.cap = None
             return False, error
 
-        print(f"[INFO] Opening video file: {self.video_path}")
-        self.cap = cv2.VideoCapture(self.video_path)
+        log.info("Opening video file: %s", self.video_path)
+        # Let libav use frame-threaded decode across cores; FFmpeg only reads this at open time
+        self.cap = cv2.VideoCapture(
+            self.video_path, cv2.CAP_FFMPEG, [cv2.CAP_PROP_N_THREADS, self.decode_threads]
+        )
         if not self.cap or not self.cap.isOpened():
             error = "Failed to open video file."
-            print(f"[ERROR] {error}")
+            log.error(error)
             self.cap = None
             return False, error
 
-        print("[INFO] Video file opened successfully.")
+        log.info("Video file opened successfully.")
         return True, None
 
     def start(self):
         with self.lock:
             if self.running:
                 return True, None
-            ok, error = self._open()
+            with self._cap_lock:
+                ok, error = self._open()
             if not ok:
                 return False, error or "Unable to open source"
             try:
@@ -91,7 +129,7 @@ class Camera:
             self._ensure_detector()
             if self.detector_error:
                 msg = f"Detector unavailable: {self.detector_error}"
-                print(f"[ERROR] {msg}")
+                log.error(msg)
                 self.stop()
                 return False, msg
             self.running = self.cap is not None and self.cap.isOpened()
@@ -102,86 +140,255 @@ class Camera:
 
     def stop(self):
         with self.lock:
-            if self.cap:
-                try:
-                    self.cap.release()
-                except Exception:
-                    pass
-            self.cap = None
             self.running = False
+            # Waits for an in-flight grab/retrieve before releasing the capture
+            with self._cap_lock:
+                if self.cap:
+                    try:
+                        self.cap.release()
+                    except Exception:
+                        pass
+                self.cap = None
 
     def frames(self):
-        from .events import emit_vehicle_event
+        """
+        Yield JPEG-encoded frames for one viewer.
 
-        while True:
-            with self.lock:
-                if not self.running or not self.cap:
+        All viewers subscribe to a single shared pipeline, so decode, detection
+        and encoding cost stays the same no matter how many clients watch.
+        """
+        q: queue.Queue = queue.Queue(maxsize=self.prefetch)
+        self._subscribe(q)
+        try:
+            while True:
+                jpeg = q.get()
+                if jpeg is None:
                     break
-                ok, frame = self.cap.read()
-                if not ok and self.loop_video:
-                    # Loop: reopen the file
-                    self.cap.release()
-                    reopened, _ = self._open()
-                    if not reopened:
+                yield jpeg
+        finally:
+            self._unsubscribe(q)
+
+    def _subscribe(self, q: queue.Queue):
+        with self._sub_lock:
+            self._subscribers.append(q)
+            if self._pipeline_stop is None:
+                self._pipeline_stop = threading.Event()
+                threading.Thread(target=self._run_pipeline, args=(self._pipeline_stop,), daemon=True).start()
+
+    def _unsubscribe(self, q: queue.Queue):
+        with self._sub_lock:
+            if q in self._subscribers:
+                self._subscribers.remove(q)
+            if not self._subscribers and self._pipeline_stop is not None:
+                self._pipeline_stop.set()
+                self._pipeline_stop = None
+
+    def _broadcast(self, item):
+        with self._sub_lock:
+            subscribers = list(self._subscribers)
+        for q in subscribers:
+            self._offer(q, item)
+
+    @staticmethod
+    def _offer(q: queue.Queue, item):
+        """Non-blocking put; a slow viewer drops its oldest frame instead of stalling others."""
+        try:
+            q.put_nowait(item)
+        except queue.Full:
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                q.put_nowait(item)
+            except queue.Full:
+                pass
+
+    def _run_pipeline(self, stop_event: threading.Event):
+        """
+        Run the shared reader -> detector -> encoder pipeline.
+
+        A reader thread decodes frames and queues each as a (display, full)
+        pair: the copy downscaled to the stream size and the original. An
+        encoder thread JPEG-encodes annotated frames and broadcasts them to
+        subscribers, while detection runs on this thread. Bounded queues
+        between the stages provide back-pressure.
+        """
+        from .events import queue_vehicle_event
+
+        read_q: queue.Queue = queue.Queue(maxsize=self._read_queue_size())
+        encode_q: queue.Queue = queue.Queue(maxsize=self.prefetch)
+        threading.Thread(target=self._reader_thread, args=(read_q, stop_event), daemon=True).start()
+        encoder = threading.Thread(target=self._encoder_thread, args=(encode_q, stop_event), daemon=True)
+        encoder.start()
+
+        # Detected events are queued for the DB writer straight from this loop, under one app context
+        ctx = self.app.app_context() if self.app else nullcontext()
+        try:
+            with ctx:
+                source_ended = False
+                while not source_ended:
+                    item = self._get(read_q, stop_event)
+                    if item is None:
                         break
-                    continue
-            if not ok:
-                break
+                    batch = [item]
+                    # Batch whatever the reader has already decoded; never wait to fill it
+                    while len(batch) < self.detect_batch:
+                        try:
+                            item = read_q.get_nowait()
+                        except queue.Empty:
+                            break
+                        if item is None:
+                            source_ended = True
+                            break
+                        batch.append(item)
+                    displays = [display for display, _ in batch]
+                    fulls = [full for _, full in batch]
+                    for annotated, events in self._detect(displays, fulls):
+                        self._emit_events(events, queue_vehicle_event)
+                        if not self._put(encode_q, annotated, stop_event):
+                            source_ended = True
+                            break
+                self._put(encode_q, None, stop_event)
+                encoder.join()
+        finally:
+            stop_event.set()
+            with self._sub_lock:
+                if self._pipeline_stop is stop_event:
+                    self._pipeline_stop = None
+                    subscribers = list(self._subscribers)
+                else:
+                    subscribers = []
+            # Source ended: release remaining viewers
+            for q in subscribers:
+                self._offer(q, None)
+
+    def _read_queue_size(self) -> int:
+        # Deep enough that a full detection batch can accumulate while the detector runs
+        return max(self.prefetch, self.detect_batch)
+
+    @staticmethod
+    def _put(q: queue.Queue, item, stop_event: threading.Event) -> bool:
+        """Blocking put that gives up once the pipeline is stopped."""
+        while not stop_event.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    @staticmethod
+    def _get(q: queue.Queue, stop_event: threading.Event):
+        """Blocking get that returns None once the pipeline is stopped."""
+        while not stop_event.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return None
+
+    def _reader_thread(self, read_q: queue.Queue, stop_event: threading.Event):
+        frame_count = 0
+        # Preallocated resize targets, one per frame that can be in flight
+        # (read queue + detector batch + encode queue + encoder + the one being read)
+        width, height = self.stream_size
+        display_bufs = [np.empty((height, width, 3), dtype=np.uint8) for _ in range(self._read_queue_size() + self.detect_batch + self.prefetch + 2)]
+        slot = 0
+        try:
+            while not stop_event.is_set():
+                with self.lock:
+                    if not self.running:
+                        break
+                # Only the capture lock is held across the blocking grab/decode
+                with self._cap_lock:
+                    if not self.cap:
+                        break
+                    ok = self.cap.grab()
+                    if not ok and self.loop_video:
+                        # Loop: reopen the file
+                        self.cap.release()
+                        reopened, _ = self._open()
+                        if not reopened:
+                            break
+                        continue
+                    if ok:
+                        frame_count += 1
+                        # Skipped frames are grabbed but never decoded
+                        if (frame_count - 1) % self.detect_every_n:
+                            continue
+                        ok, full = self.cap.retrieve()
+                if not ok:
+                    break
+                try:
+                    # Single downscale shared by detection, snapshots and the stream;
+                    # the original is kept alongside it for plate OCR
+                    display = cv2.resize(full, self.stream_size, dst=display_bufs[slot], interpolation=cv2.INTER_AREA)
+                    slot = (slot + 1) % len(display_bufs)
+                except Exception:
+                    display = full
+                if not self._put(read_q, (display, full), stop_event):
+                    break
+        finally:
+            self._put(read_q, None, stop_event)
 
-            annotated, events = self._detect(frame)
-            self._emit_events(events, emit_vehicle_event)
+    def _encoder_thread(self, encode_q: queue.Queue, stop_event: threading.Event):
+        while True:
+            annotated = self._get(encode_q, stop_event)
+            if annotated is None:
+                break
+            jpeg = self._encode_jpeg(annotated)
+            if jpeg:
+                self._broadcast(jpeg)
 
+    def _encode_jpeg(self, frame) -> Optional[bytes]:
+        if _tj is not None:
             try:
-                annotated = cv2.resize(annotated, (960, 540))
+                return _tj.encode(frame, quality=self.stream_quality)
             except Exception:
                 pass
-            ok, buf = cv2.imencode(".jpg", annotated, [int(cv2.IMWRITE_JPEG_QUALITY), 80])
-            if ok:
-                yield buf.tobytes()
-            else:
-                time.sleep(0.01)
+        ok, buf = cv2.imencode(".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), self.stream_quality])
+        return buf.tobytes() if ok else None
 
     def _ensure_detector(self):
         if self.detector or self.detector_error:
             return
         if VehicleDetector is None:
-            print(f"[WARN] YOLO detector unavailable: {self.detector_error}")
+            log.warning("YOLO detector unavailable: %s", self.detector_error)
             return
         try:
             self.detector = VehicleDetector()
-            print("[INFO] YOLOv8 vehicle detector initialized.")
+            log.info("YOLOv8 vehicle detector initialized.")
         except Exception as exc:  # pragma: no cover - runtime failure guard
             self.detector_error = exc
-            print(f"[ERROR] Failed to initialize YOLO detector: {exc}")
+            log.error("Failed to initialize YOLO detector: %s", exc)
 
-    def _detect(self, frame):
+    def _detect(self, frames, full_frames):
         if not self.detector:
-            return frame, []
+            return [(frame, []) for frame in frames]
         try:
-            return self.detector.process_frame(frame)
+            return self.detector.process_frames(frames, full_frames)
         except Exception as exc:  # pragma: no cover - runtime failure guard
-            print(f"[ERROR] YOLO detection failed: {exc}")
-            return frame, []
+            log.error("YOLO detection failed: %s", exc)
+            return [(frame, []) for frame in frames]
 
     def _emit_events(self, events: List[DetectionEvent], emit_callable):
-        if not events:
-            return
-        ctx = self.app.app_context() if self.app else nullcontext()
-        with ctx:
-            for event in events:
-                payload = {
-                    'vehicle_number': event.vehicle_number,
-                    'status': event.status,
-                    'authorized_as': event.authorized_as,
-                    'confidence': event.confidence,
-                    'snapshot_path': event.snapshot_path,
-                    'vehicle_type': event.vehicle_type,
-                    'time_stamp': event.timestamp or datetime.utcnow(),
-                }
-                try:
-                    emit_callable(payload)
-                except Exception as exc:  # pragma: no cover - runtime failure guard
-                    print(f"[ERROR] Failed to emit vehicle event: {exc}")
+        """Hand events to `emit_callable`, which only enqueues them, so it runs inline and in order."""
+        for event in events:
+            payload = {
+                'vehicle_number': event.vehicle_number,
+                'status': event.status,
+                'authorized_as': event.authorized_as,
+                'confidence': event.confidence,
+                'snapshot_path': event.snapshot_path,
+                'vehicle_type': event.vehicle_type,
+                'time_stamp': event.timestamp or datetime.utcnow(),
+                'snapshot_bytes': event.snapshot_bytes,
+            }
+            try:
+                emit_callable(payload)
+            except Exception as exc:  # pragma: no cover - runtime failure guard
+                log.error("Failed to emit vehicle event: %s", exc)
 
     def describe_source(self) -> str:
         return self.source_label
@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+import heapq
+import math
 import os
 import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
 from typing import List, Sequence, Tuple, Optional
@@ -13,6 +17,22 @@ from ultralytics import YOLO
 
 from .metrics import PerformanceTracker, performance_tracker
 
+try:
+    import torch  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    torch = None
+
+try:
+    import tensorrt  # type: ignore  # noqa: F401
+    HAS_TENSORRT = True
+except Exception:  # pragma: no cover - optional dependency
+    HAS_TENSORRT = False
+
+try:
+    import onnxruntime as ort  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    ort = None
+
 try:
     import easyocr  # type: ignore
     OCR_IMPORT_ERROR = None
@@ -20,49 +40,38 @@ except Exception as exc:  # pragma: no cover - optional dependency
     easyocr = None
     OCR_IMPORT_ERROR = exc
 
-try:  # Torch 2.6+ safe loading workaround
-    import importlib
-    import pkgutil
-
-    from torch.serialization import add_safe_globals  # type: ignore
-    from torch.nn import ModuleList, Sequential  # type: ignore
-    from ultralytics.nn import modules  # type: ignore
-    from ultralytics.nn.tasks import DetectionModel  # type: ignore
-
-    safe_items = {DetectionModel, ModuleList, Sequential}
-
-    def collect_types(mod):
-        for attr_name in dir(mod):
-            attr = getattr(mod, attr_name, None)
-            if isinstance(attr, type):
-                safe_items.add(attr)
-
-    collect_types(modules)
-    conv_cls = getattr(modules, 'Conv', None)
-    if conv_cls:
-        safe_items.add(conv_cls)
-    if hasattr(modules, "__path__"):
-        for _, name, _ in pkgutil.walk_packages(modules.__path__, modules.__name__ + "."):
-            try:
-                submod = importlib.import_module(name)
-            except Exception:
-                continue
-            collect_types(submod)
+try:
+    from numba import njit  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    def njit(*args, **kwargs):
+        # Plain-Python fallback: return the function undecorated
+        if args and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
 
-    add_safe_globals(list(safe_items))
-except Exception:
-    pass
 
-try:  # Fallback: force torch.load to allow full checkpoints on PyTorch 2.6+
-    import torch
-    from ultralytics.nn import tasks as yolo_tasks  # type: ignore
+@njit(cache=True, nogil=True)
+def _jit_hypot(ax, ay, bx, by):
+    return math.hypot(ax - bx, ay - by)
 
-    def torch_safe_load_override(weight):
-        return torch.load(weight, map_location="cpu", weights_only=False), weight  # type: ignore[arg-type]
 
-    yolo_tasks.torch_safe_load = torch_safe_load_override  # type: ignore[attr-defined]
-except Exception:
-    pass
+@njit(cache=True, nogil=True)
+def _jit_grid(x, y, g):
+    return int(x // g), int(y // g)
+
+
+# PyTorch 2.6 made torch.load default to weights_only=True, which rejects full
+# Ultralytics checkpoints; load them unrestricted (trusted local weights only).
+if torch is not None and tuple(int(p) for p in re.findall(r'\d+', torch.__version__)[:2]) >= (2, 6):
+    try:
+        from ultralytics.nn import tasks as yolo_tasks  # type: ignore
+
+        def torch_safe_load_override(weight):
+            return torch.load(weight, map_location="cpu", weights_only=False), weight  # type: ignore[arg-type]
+
+        yolo_tasks.torch_safe_load = torch_safe_load_override  # type: ignore[attr-defined]
+    except Exception:
+        pass
 
 
 @dataclass
@@ -74,6 +83,8 @@ class DetectionEvent:
     authorized_as: str = 'Unauthorized'
     vehicle_type: str = 'Vehicle'
     timestamp: datetime | None = None
+    # Encoded JPEG reused for alert uploads; a Future resolving to it while the write is pending
+    snapshot_bytes: bytes | Future | None = None
 
 
 class VehicleDetector:
@@ -87,6 +98,26 @@ class VehicleDetector:
 
     VEHICLE_CLASS_IDS: Sequence[int] = (2, 3, 5, 7)  # car, motorcycle, bus, truck (COCO ids)
     COLOR = (0, 255, 0)
+    INPUT_SIZE = 640
+    OCR_MIN_WIDTH = 250  # plate crops are upscaled to at least this width
+    OCR_RETRY_CONFIDENCE = 0.4  # below this, OCR is retried on the raw crop
+    PLATE_ROI_ASPECT = (1.5, 6.0)  # width/height range of a readable plate strip
+    PLATE_ROI_MIN_AREA = 600  # px; smaller strips never OCR reliably
+    CONFIRMED_PLATE_TTL = 2.0  # seconds a confidently voted plate skips OCR for its grid cell
+    OCR_PARAMS = dict(
+        allowlist='0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ',  # plates are alphanumeric only
+        paragraph=False,
+        detail=1,
+        width_ths=0.6,  # Lower threshold to catch more text
+        height_ths=0.6,
+        slope_ths=0.1,
+        mag_ratio=2.0,  # Magnify image for better recognition
+    )
+    NMS_IOU_THRESHOLD = 0.7  # Ultralytics default
+    SNAPSHOT_JPEG_QUALITY = 85
+    # Every byte outside [0-9A-Z]; deleted with bytes.translate after uppercasing
+    _NON_ALNUM_BYTES = bytes(c for c in range(256) if not (48 <= c <= 57 or 65 <= c <= 90))
+    _PLATE_RE = re.compile(rb'^([A-Z]{2})(\d{1,2})([A-Z]{1,2})(\d{3,4})$')
 
     def __init__(
         self,
@@ -107,6 +138,25 @@ class VehicleDetector:
         else:
             self.names = {int(idx): str(name) for idx, name in enumerate(raw_names)}
         self.confidence_threshold = confidence_threshold
+        self._vehicle_ids = np.array(self.VEHICLE_CLASS_IDS, dtype=np.int64)
+
+        cuda_available = torch is not None and torch.cuda.is_available()
+        self.device = os.getenv('YOLO_DEVICE') or ('cuda:0' if cuda_available else 'cpu')
+        self.half = self.device.startswith('cuda')
+        # Most frames the camera hands over in one call; sizes the exported engine and ORT input
+        self.max_batch = max(int(os.getenv('DETECT_BATCH', 8)), 1)
+
+        # Backend preference: TensorRT engine on CUDA, then ONNX Runtime, then Ultralytics predict.
+        # On CUDA, ORT is only used with its CUDA provider; the CPU-only wheel would run FP32 on
+        # the CPU, so Ultralytics predict (FP16 on the GPU) is used instead.
+        self.session = None
+        use_onnx = ort is not None and os.getenv('YOLO_BACKEND', 'onnx').lower() == 'onnx'
+        if use_onnx and self.half:
+            use_onnx = 'CUDAExecutionProvider' in ort.get_available_providers()
+        if self.half and HAS_TENSORRT:
+            self._init_tensorrt(model_path)
+        elif use_onnx:
+            self._init_onnx(model_path)
         self.cooldown_seconds = cooldown_seconds
         self.distance_threshold = distance_threshold
 
@@ -117,20 +167,88 @@ class VehicleDetector:
 
         self.snapshot_dir = snapshot_dir
         self.snapshot_rel_dir = os.path.relpath(snapshot_dir, base_dir).replace('\\', '/')
+        # Snapshot encode + write runs off the detection loop (imencode releases the GIL)
+        self._snapshot_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='snapshot')
 
         # OCR performance tuning (can be overridden via env vars)
-        self.ocr_max_variants = max(int(os.getenv('OCR_VARIANTS', 5)), 1)
-        self.ocr_early_stop_conf = float(os.getenv('OCR_EARLY_CONF', 0.6))
         self.ocr_min_confidence = float(os.getenv('OCR_MIN_CONF', 0.35))
         self.ocr_fallback_confidence = float(os.getenv('OCR_FALLBACK_CONF', 0.25))
-
-        # recent detections memory
-        self._recent: List[Tuple[Tuple[float, float], float]] = []
+        # OCR gates, in pixels of the full-resolution frame the plate is cropped from:
+        # vehicles shorter than this are too far away for a legible plate
+        self.min_plate_readable_h = int(os.getenv('MIN_PLATE_READABLE_H', 80))
+        # and vehicle boxes below this area (px^2) are not worth an OCR pass
+        self.ocr_min_box_area = int(os.getenv('OCR_MIN_BOX_AREA', 6400))
+
+        # recent detections memory, bucketed on a grid of distance_threshold-sized cells
+        self._recent_grid: dict[Tuple[int, int], deque] = {}
+        # min-heap of (timestamp, cell) used to expire grid entries lazily, oldest first
+        self._recent_heap: List[Tuple[float, Tuple[int, int]]] = []
         # OCR temporal consistency: store recent plate readings per vehicle position
-        self._plate_readings: dict = {}  # key: (center_x, center_y), value: list of (plate, confidence, timestamp)
+        self._plate_readings: dict = {}  # key: (center_x, center_y), value: deque of (plate, confidence, timestamp)
+        # key -> (plate, expiry) for plates voted in confidently enough to skip OCR entirely
+        self._confirmed_plates: dict[Tuple[int, int], Tuple[str, float]] = {}
         self.ocr_reader = None
         self.ocr_error = OCR_IMPORT_ERROR
+        # Invariant OpenCV objects for _preprocess_roi, built once
+        self._clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+        self._gray_buf: np.ndarray | None = None
+        # Run the preprocessing chain through OpenCV's T-API when an OpenCL device exists
+        self._use_ocl = os.getenv('OCR_OPENCL', '1') == '1' and cv2.ocl.haveOpenCL()
+        if self._use_ocl:
+            cv2.ocl.setUseOpenCL(True)
+        # Reusable INPUT_SIZE letterbox canvases, one per frame in a detection batch
+        self._det_bufs: List[np.ndarray] = []
         self.metrics = metrics_tracker or performance_tracker
+        self._warmup()
+
+    def _init_onnx(self, model_path: str) -> None:
+        """Export the weights to ONNX once and open an ORT session on them."""
+        try:
+            onnx_path = os.path.splitext(model_path)[0] + '.onnx'
+            if not os.path.exists(onnx_path):
+                onnx_path = self.model.export(format='onnx', dynamic=True, simplify=True, imgsz=self.INPUT_SIZE)
+            available = ort.get_available_providers()
+            wanted = ('CUDAExecutionProvider', 'CPUExecutionProvider') if self.half else ('CPUExecutionProvider',)
+            providers = [p for p in wanted if p in available]
+            self.session = ort.InferenceSession(onnx_path, providers=providers)
+            self._input_name = self.session.get_inputs()[0].name
+            size = self.INPUT_SIZE
+            # Sized for the largest batch once; smaller batches run on a leading slice
+            self._input_buf = np.zeros((self.max_batch, 3, size, size), dtype=np.float32)
+            print(f"[INFO] YOLO running on ONNX Runtime ({', '.join(providers)}).")
+        except Exception as exc:  # pragma: no cover - runtime failure guard
+            self.session = None
+            print(f"[WARN] ONNX Runtime unavailable, using Ultralytics predict: {exc}")
+
+    def _init_tensorrt(self, model_path: str) -> None:
+        """Export an FP16 TensorRT engine once and run it through Ultralytics."""
+        try:
+            engine_path = os.path.splitext(model_path)[0] + '.engine'
+            if not os.path.exists(engine_path):
+                engine_path = self.model.export(
+                    format='engine',
+                    half=True,
+                    dynamic=True,
+                    batch=self.max_batch,
+                    device=self.device,
+                )
+            self.model = YOLO(engine_path)
+            print("[INFO] YOLO running on TensorRT engine (FP16).")
+        except Exception as exc:  # pragma: no cover - runtime failure guard
+            print(f"[WARN] TensorRT export failed, using PyTorch on {self.device}: {exc}")
+
+    def _warmup(self) -> None:
+        """Fuse Conv+BN and run one dummy batch so the first real frame isn't paying for lazy init."""
+        if self.session is None:
+            try:
+                self.model.fuse()
+            except Exception:  # exported engines are already fused
+                pass
+        try:
+            size = self.INPUT_SIZE
+            self._detect_boxes_batch([np.zeros((size, size, 3), dtype=np.uint8)])
+        except Exception as exc:  # pragma: no cover - runtime failure guard
+            print(f"[WARN] YOLO warmup failed: {exc}")
 
     def _ensure_ocr(self):
         if self.ocr_reader or self.ocr_error:
@@ -140,161 +258,203 @@ class VehicleDetector:
             print(f"[WARN] License plate OCR unavailable: {self.ocr_error}")
             return
         try:
-            self.ocr_reader = easyocr.Reader(['en'], gpu=False)
-            print("[INFO] EasyOCR reader initialized for license plates.")
+            use_gpu = torch is not None and torch.cuda.is_available()
+            self.ocr_reader = easyocr.Reader(['en'], gpu=use_gpu)
+            print(f"[INFO] EasyOCR reader initialized for license plates (gpu={use_gpu}).")
         except Exception as exc:  # pragma: no cover - runtime failure guard
             self.ocr_error = exc
             print(f"[ERROR] Failed to initialize EasyOCR: {exc}")
 
     def _normalize_plate(self, text: str) -> str | None:
-        cleaned = re.sub(r'[^A-Z0-9]', '', text.upper())
-        match = re.match(r'^([A-Z]{2})(\d{1,2})([A-Z]{1,2})(\d{3,4})$', cleaned)
+        cleaned = text.encode('ascii', 'ignore').upper().translate(None, self._NON_ALNUM_BYTES)
+        match = self._PLATE_RE.match(cleaned)
         if not match:
             return None
         state, district, series, number = match.groups()
-        return f"{state} {int(district):02d} {series} {int(number):04d}"
+        return f"{state.decode()} {int(district):02d} {series.decode()} {int(number):04d}"
 
     def _preprocess_roi(self, roi: np.ndarray) -> List[np.ndarray]:
-        """Apply multiple preprocessing techniques to improve OCR accuracy."""
-        processed = []
-        if roi.size == 0:
-            return processed
-
-        limit = self.ocr_max_variants
-
-        def add_variant(img):
-            if len(processed) < limit:
-                processed.append(img)
+        """
+        Prepare a plate ROI for OCR with a single enhancement chain.
 
-        # Original ROI
-        add_variant(roi.copy())
-        if len(processed) >= limit:
-            return processed
-        
-        # Convert to grayscale if needed
-        if len(roi.shape) == 3:
-            gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
+        Upscale, grayscale, bilateral filter, CLAHE and unsharp mask; no
+        binarization, since EasyOCR's recognizer prefers continuous grayscale.
+        With OpenCL available the chain runs on a `cv2.UMat` and is downloaded once.
+        """
+        if roi.size == 0:
+            return []
+
+        is_color = len(roi.shape) == 3
+        h, w = roi.shape[:2]
+        if self._use_ocl:
+            roi = cv2.UMat(roi)
+
+        # Upscale narrow crops (capped at 3x) so characters are large enough to read
+        if w < self.OCR_MIN_WIDTH:
+            scale = min(self.OCR_MIN_WIDTH / w, 3.0)
+            roi = cv2.resize(roi, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_CUBIC)
+
+        if self._use_ocl:
+            gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY) if is_color else roi
+        elif is_color:
+            # Reuse the grayscale scratch buffer while consecutive crops share a size
+            if self._gray_buf is None or self._gray_buf.shape != roi.shape[:2]:
+                self._gray_buf = np.empty(roi.shape[:2], dtype=np.uint8)
+            gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY, dst=self._gray_buf)
         else:
-            gray = roi.copy()
-        
-        # Resize to minimum height for better OCR (EasyOCR works better with larger text)
-        min_height = 50
-        if gray.shape[0] < min_height:
-            scale = min_height / gray.shape[0]
-            new_width = int(gray.shape[1] * scale)
-            gray = cv2.resize(gray, (new_width, min_height), interpolation=cv2.INTER_CUBIC)
-        
-        # Method 1: Grayscale
-        add_variant(gray)
-        if len(processed) >= limit:
-            return processed
-        
-        # Method 2: Grayscale with contrast enhancement (CLAHE)
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-        enhanced = clahe.apply(gray)
-        add_variant(enhanced)
-        if len(processed) >= limit:
-            return processed
-        
-        # Method 3: Threshold (binary)
-        _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-        add_variant(thresh)
-        if len(processed) >= limit:
-            return processed
-        
-        # Method 4: Adaptive threshold
-        adaptive = cv2.adaptiveThreshold(
-            gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2
-        )
-        add_variant(adaptive)
-        if len(processed) >= limit:
-            return processed
-        
-        # Method 5: Denoised + enhanced
-        denoised = cv2.fastNlMeansDenoising(gray, None, 10, 7, 21)
-        denoised_enhanced = clahe.apply(denoised)
-        add_variant(denoised_enhanced)
-        if len(processed) >= limit:
-            return processed
-        
-        # Method 6: Morphological operations to clean up text
-        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (2, 2))
-        morph = cv2.morphologyEx(gray, cv2.MORPH_CLOSE, kernel)
-        add_variant(morph)
-        if len(processed) >= limit:
-            return processed
-        
-        # Method 7: Sharpen image
-        kernel_sharpen = np.array([[-1, -1, -1],
-                                   [-1,  9, -1],
-                                   [-1, -1, -1]])
-        sharpened = cv2.filter2D(gray, -1, kernel_sharpen)
-        add_variant(sharpened)
-        if len(processed) >= limit:
-            return processed
-        
-        # Method 8: High contrast version
-        high_contrast = cv2.convertScaleAbs(gray, alpha=1.5, beta=30)
-        add_variant(high_contrast)
-        
-        return processed
+            gray = roi
+
+        # Edge-preserving denoise, then local contrast, then unsharp mask
+        smoothed = cv2.bilateralFilter(gray, 9, 75, 75)
+        enhanced = self._clahe.apply(smoothed)
+        blurred = cv2.GaussianBlur(enhanced, (0, 0), 3)
+        sharpened = cv2.addWeighted(enhanced, 1.5, blurred, -0.5, 0)
+        return [sharpened.get() if self._use_ocl else sharpened]
 
     def _get_spatial_key(self, center: Tuple[float, float]) -> Tuple[int, int]:
         """Convert center to spatial key for approximate matching (handles slight movement)."""
         # Round to nearest 20 pixels for spatial hashing
-        grid_size = 20
-        return (int(center[0] // grid_size), int(center[1] // grid_size))
+        return _jit_grid(center[0], center[1], 20.0)
     
-    def _get_best_plate_from_readings(self, center: Tuple[float, float], current_time: float) -> str | None:
-        """Get best plate number from temporal readings using voting."""
-        # Use spatial key for approximate matching
-        key = self._get_spatial_key(center)
-        if key not in self._plate_readings:
+    def _get_best_plate_from_readings(self, key: Tuple[int, int], current_time: float) -> str | None:
+        """Get best plate number from temporal readings (keyed by `_get_spatial_key`) using voting."""
+        readings = self._plate_readings.get(key)
+        if readings is None:
             return None
         
-        # Clean old readings (older than 3 seconds)
-        self._plate_readings[key] = [
-            (plate, conf, ts) for plate, conf, ts in self._plate_readings[key]
-            if (current_time - ts) <= 3.0
-        ]
+        # Clean old readings (older than 3 seconds); they are appended in time order
+        while readings and (current_time - readings[0][2]) > 3.0:
+            readings.popleft()
         
-        if not self._plate_readings[key]:
+        if not readings:
             del self._plate_readings[key]
             return None
         
         # Count votes for each plate (weighted by confidence)
         plate_votes: dict[str, float] = {}
-        for plate, conf, _ in self._plate_readings[key]:
+        plate_counts: dict[str, int] = {}
+        for plate, conf, _ in readings:
             plate_votes[plate] = plate_votes.get(plate, 0.0) + conf
+            plate_counts[plate] = plate_counts.get(plate, 0) + 1
         
         # Return plate with highest weighted votes
         if plate_votes:
             best_plate = max(plate_votes.items(), key=lambda x: x[1])[0]
             total_votes = plate_votes[best_plate]
+            if total_votes >= 1.5 or plate_counts[best_plate] >= 3:
+                # Settled: later frames in this cell skip preprocessing and OCR
+                self._confirmed_plates[key] = (best_plate, current_time + self.CONFIRMED_PLATE_TTL)
             # Only return if we have at least 2 readings or high confidence
-            if len(self._plate_readings[key]) >= 2 or total_votes >= 0.7:
+            if len(readings) >= 2 or total_votes >= 0.7:
                 return best_plate
         
         return None
 
+    def _ocr_best_plates(self, images: Sequence[np.ndarray]) -> List[Tuple[str | None, float]]:
+        """Run EasyOCR over `images` in one batched call; best (plate, confidence) per image."""
+        # Images can differ in size; batch them at the largest, padding (not stretching)
+        # smaller crops so their plate text keeps its aspect ratio
+        n_height = max(img.shape[0] for img in images)
+        n_width = max(img.shape[1] for img in images)
+        padded = [
+            img if img.shape[:2] == (n_height, n_width) else cv2.copyMakeBorder(
+                img, 0, n_height - img.shape[0], 0, n_width - img.shape[1], cv2.BORDER_CONSTANT, value=0
+            )
+            for img in images
+        ]
+        try:
+            batched_results = self.ocr_reader.readtext_batched(
+                padded, n_width=n_width, n_height=n_height, **self.OCR_PARAMS
+            )
+        except Exception:  # pragma: no cover - runtime failure guard
+            return [(None, 0.0)] * len(images)
+
+        best: List[Tuple[str | None, float]] = []
+        for results in batched_results:
+            best_candidate: str | None = None
+            best_confidence = 0.0
+            for _, text, conf in results:
+                # Lower confidence threshold to get more candidates
+                if conf < 0.25:
+                    continue
+                candidate = self._normalize_plate(text)
+                if candidate and conf > best_confidence:
+                    best_candidate = candidate
+                    best_confidence = conf
+            best.append((best_candidate, best_confidence))
+        return best
+
     def _read_license_plate(self, frame: np.ndarray, box: Tuple[int, int, int, int], center: Tuple[float, float] | None = None) -> str | None:
+        return self._read_license_plates(frame, [box], [center])[0]
+
+    def _read_license_plates(
+        self,
+        frame: np.ndarray,
+        boxes: Sequence[Tuple[int, int, int, int]],
+        centers: Sequence[Tuple[float, float] | None],
+    ) -> List[str | None]:
+        """
+        Read the plates of every vehicle in a frame; one plate (or None) per box.
+
+        Cached readings and ROI gates are resolved per vehicle first, then all
+        surviving crops share one batched EasyOCR call (plus one for retries).
+        """
+        plates: List[str | None] = [None] * len(boxes)
         if self.ocr_error:
-            return None
+            return plates
         self._ensure_ocr()
         if not self.ocr_reader:
-            return None
+            return plates
         
         current_time = time.time()
+        # Pass 1: (index, spatial key, raw ROI, preprocessed ROI) per vehicle that still needs OCR
+        pending = []
+        for i, (box, center) in enumerate(zip(boxes, centers)):
+            # Spatial key for approximate matching, computed once per vehicle
+            key = self._get_spatial_key(center) if center else None
+            # Check temporal consistency first
+            if key is not None:
+                confirmed = self._confirmed_plates.get(key)
+                if confirmed is not None:
+                    if confirmed[1] > current_time:
+                        plates[i] = confirmed[0]
+                        continue
+                    del self._confirmed_plates[key]
+                cached_plate = self._get_best_plate_from_readings(key, current_time)
+                if cached_plate:
+                    plates[i] = cached_plate
+                    continue
+            roi = self._plate_roi(frame, box)
+            if roi is None:
+                continue
+            processed_rois = self._preprocess_roi(roi)
+            if processed_rois:
+                pending.append((i, key, roi, processed_rois[0]))
+        if not pending:
+            return plates
         
-        # Check temporal consistency first
-        if center:
-            cached_plate = self._get_best_plate_from_readings(center, current_time)
-            if cached_plate:
-                return cached_plate
+        # Pass 2: recognise every crop in one batch
+        reads = self._ocr_best_plates([processed for _, _, _, processed in pending])
+        weak = [j for j, (_, confidence) in enumerate(reads) if confidence < self.OCR_RETRY_CONFIDENCE]
+        if weak:
+            # Weak reads on the enhanced crops: retry once on the raw colour crops
+            retries = self._ocr_best_plates([pending[j][2] for j in weak])
+            for j, (candidate, confidence) in zip(weak, retries):
+                if candidate and confidence > reads[j][1]:
+                    reads[j] = (candidate, confidence)
         
+        for (i, key, _, _), (candidate, confidence) in zip(pending, reads):
+            if candidate:
+                plates[i] = self._accept_reading(key, candidate, confidence, current_time)
+        return plates
+
+    def _plate_roi(self, frame: np.ndarray, box: Tuple[int, int, int, int]) -> np.ndarray | None:
+        """Crop the likely plate strip of a vehicle box; None when it cannot hold a readable plate."""
         x1, y1, x2, y2 = box
         h = max(y2 - y1, 1)
         w = max(x2 - x1, 1)
+        if h < self.min_plate_readable_h:
+            return None
         
         # Better ROI extraction - focus on bottom 30-40% of vehicle
         roi_top = max(y2 - int(h * 0.35), y1)
@@ -304,69 +464,34 @@ class VehicleDetector:
         
         if roi.size == 0 or roi.shape[0] < 10 or roi.shape[1] < 20:
             return None
-        
-        # Allowlist: Only allow alphanumeric characters (A-Z, 0-9)
-        allowlist = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
-        
-        # Try multiple preprocessing techniques
-        processed_rois = self._preprocess_roi(roi)
-        best_candidate: str | None = None
-        best_confidence: float = 0.0
-        
-        for processed_roi in processed_rois:
-            try:
-                # Use allowlist and adjust parameters for better accuracy
-                results = self.ocr_reader.readtext(
-                    processed_roi,
-                    allowlist=allowlist,
-                    paragraph=False,
-                    detail=1,
-                    width_ths=0.6,  # Lower threshold to catch more text
-                    height_ths=0.6,
-                    slope_ths=0.1,
-                    mag_ratio=2.0  # Magnify image for better recognition
-                )
-                
-                for _, text, conf in results:
-                    # Lower confidence threshold to get more candidates
-                    if conf < 0.25:
-                        continue
-                    candidate = self._normalize_plate(text)
-                    if candidate and conf > best_confidence:
-                        best_candidate = candidate
-                        best_confidence = conf
-                if best_candidate and best_confidence >= self.ocr_early_stop_conf:
-                    break
-            except Exception as exc:  # pragma: no cover - runtime failure guard
-                # Continue with next preprocessing method
-                continue
-        
-        if not best_candidate:
+        # Geometry gate: skip strips no plate could fit before paying for OCR
+        aspect = roi.shape[1] / roi.shape[0]
+        min_aspect, max_aspect = self.PLATE_ROI_ASPECT
+        if not min_aspect <= aspect <= max_aspect or roi.shape[0] * roi.shape[1] < self.PLATE_ROI_MIN_AREA:
             return None
-        
+        return roi
+
+    def _accept_reading(
+        self, key: Tuple[int, int] | None, candidate: str, confidence: float, current_time: float
+    ) -> str | None:
+        """Record an OCR reading and return the plate if it is trustworthy enough to emit."""
         # Store reading for temporal consistency
-        if center:
-            key = self._get_spatial_key(center)
-            if key not in self._plate_readings:
-                self._plate_readings[key] = []
-            self._plate_readings[key].append((best_candidate, best_confidence, current_time))
+        if key is not None:
             # Keep only last 15 readings per position
-            if len(self._plate_readings[key]) > 15:
-                self._plate_readings[key] = self._plate_readings[key][-15:]
+            if key not in self._plate_readings:
+                self._plate_readings[key] = deque(maxlen=15)
+            self._plate_readings[key].append((candidate, confidence, current_time))
         
-        # Return bestcandidate if confidence is reasonable, otherwise wait for more frames
-        min_confidence = self.ocr_min_confidence
-        fallback_confidence = self.ocr_fallback_confidence
-        if center:
-            key = self._get_spatial_key(center)
+        # Return candidate if confidence is reasonable, otherwise wait for more frames
+        if key is not None:
             readings_count = len(self._plate_readings.get(key, []))
-            if best_confidence >= min_confidence or readings_count >= 2:
-                return best_candidate
+            if confidence >= self.ocr_min_confidence or readings_count >= 2:
+                return candidate
         else:
-            if best_confidence >= min_confidence:
-                return best_candidate
+            if confidence >= self.ocr_min_confidence:
+                return candidate
         
-        return best_candidate if best_confidence >= fallback_confidence else None
+        return candidate if confidence >= self.ocr_fallback_confidence else None
 
     def process_frame(self, frame: np.ndarray) -> Tuple[np.ndarray, List[DetectionEvent]]:
         """
@@ -376,22 +501,50 @@ class VehicleDetector:
             annotated_frame: np.ndarray
             events: list of DetectionEvent for newly detected vehicles
         """
+        return self.process_frames([frame])[0]
+
+    def process_frames(
+        self,
+        frames: Sequence[np.ndarray],
+        ocr_frames: Sequence[np.ndarray] | None = None,
+    ) -> List[Tuple[np.ndarray, List[DetectionEvent]]]:
+        """
+        Run detection on a batch of BGR OpenCV frames with a single model call.
+
+        `ocr_frames`, when given, are the full-resolution originals of `frames`:
+        detection and annotation use `frames`, while plates are cropped from the
+        matching original. Returns one (annotated_frame, events) pair per input
+        frame, in order.
+        """
+        if not frames:
+            return []
+        if ocr_frames is None:
+            ocr_frames = frames
+        batch_start = time.perf_counter()
+        detections = self._detect_boxes_batch(frames)
+        # Inference is shared by the batch, so attribute it evenly per frame
+        detect_duration_ms = (time.perf_counter() - batch_start) * 1000.0 / len(frames)
+        return [
+            self._process_detections(frame, ocr_frame, boxes, detect_duration_ms)
+            for frame, ocr_frame, boxes in zip(frames, ocr_frames, detections)
+        ]
+
+    def _process_detections(
+        self,
+        frame: np.ndarray,
+        ocr_frame: np.ndarray,
+        detections: Tuple[np.ndarray, np.ndarray, np.ndarray],
+        detect_duration_ms: float,
+    ) -> Tuple[np.ndarray, List[DetectionEvent]]:
+        """Annotate one frame and run OCR (on `ocr_frame`)/de-duplication on its boxes."""
         frame_start = time.perf_counter()
-        detect_start = time.perf_counter()
-        results = self.model.predict(
-            source=frame,
-            conf=self.confidence_threshold,
-            classes=list(self.VEHICLE_CLASS_IDS),
-            device='cpu',
-            verbose=False,
-        )
-        detect_duration_ms = (time.perf_counter() - detect_start) * 1000.0
+        xyxy, confs, classes = detections
         ocr_duration_ms = 0.0
         ocr_attempts = 0
         ocr_success = 0
 
-        if not results:
-            frame_duration_ms = (time.perf_counter() - frame_start) * 1000.0
+        if xyxy.shape[0] == 0:
+            frame_duration_ms = detect_duration_ms + (time.perf_counter() - frame_start) * 1000.0
             self._record_metrics(
                 frame_ms=frame_duration_ms,
                 detect_ms=detect_duration_ms,
@@ -402,80 +555,78 @@ class VehicleDetector:
             )
             return frame, []
 
-        result = results[0]
-        boxes = getattr(result, 'boxes', None)
-        if boxes is None or boxes.xyxy is None or boxes.xyxy.shape[0] == 0:
-            frame_duration_ms = (time.perf_counter() - frame_start) * 1000.0
-            self._record_metrics(
-                frame_ms=frame_duration_ms,
-                detect_ms=detect_duration_ms,
-                ocr_ms=ocr_duration_ms,
-                events=0,
-                ocr_attempts=ocr_attempts,
-                ocr_success=ocr_success,
-            )
-            return frame, []
-
-        xyxy = boxes.xyxy.cpu().numpy()
-        confs = boxes.conf.cpu().numpy()
-        classes = boxes.cls.cpu().numpy()
+        # Filter, clamp and validate every box at once; only drawing/OCR stay per-box
+        mask = confs >= self.confidence_threshold
+        height, width = frame.shape[:2]
+        boxes = xyxy[mask].astype(np.int32)
+        np.clip(boxes, 0, [width - 1, height - 1, width - 1, height - 1], out=boxes)
+        valid = (boxes[:, 2] > boxes[:, 0]) & (boxes[:, 3] > boxes[:, 1])
+        boxes = boxes[valid]
+        confs = confs[mask][valid]
+        classes = classes[mask][valid]
+        centers = np.column_stack(((boxes[:, 0] + boxes[:, 2]) * 0.5, (boxes[:, 1] + boxes[:, 3]) * 0.5))
+        if ocr_frame is frame:
+            ocr_boxes = boxes
+        else:
+            # Scale the boxes up to the original frame, where the OCR gates and plate crops are measured
+            ocr_height, ocr_width = ocr_frame.shape[:2]
+            ocr_boxes = (boxes * np.array([ocr_width / width, ocr_height / height] * 2)).astype(np.int32)
+            np.clip(ocr_boxes, 0, [ocr_width - 1, ocr_height - 1, ocr_width - 1, ocr_height - 1], out=ocr_boxes)
+        # Only vehicles large enough to carry a legible plate get the full-resolution OCR pass
+        ocr_ok = (ocr_boxes[:, 2] - ocr_boxes[:, 0]) * (ocr_boxes[:, 3] - ocr_boxes[:, 1]) > self.ocr_min_box_area
 
-        annotated = frame.copy()
         events: List[DetectionEvent] = []
         now = time.time()
-
-        for coords, conf, cls_id in zip(xyxy, confs, classes):
-            confidence = float(conf)
-            if confidence < self.confidence_threshold:
-                continue
-
-            x1, y1, x2, y2 = (
-                max(int(coords[0]), 0),
-                max(int(coords[1]), 0),
-                min(int(coords[2]), frame.shape[1] - 1),
-                min(int(coords[3]), frame.shape[0] - 1),
-            )
-            if x2 <= x1 or y2 <= y1:
-                continue
-            center = ((x1 + x2) / 2.0, (y1 + y2) / 2.0)
-
-            label = self.names.get(int(cls_id), 'vehicle').upper()
-            text = f"{label} {confidence*100:.1f}%"
-            cv2.rectangle(annotated, (x1, y1), (x2, y2), self.COLOR, 2)
-            cv2.putText(
-                annotated,
-                text,
-                (x1, max(y1 - 10, 20)),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.6,
-                self.COLOR,
-                2,
-                cv2.LINE_AA,
+        boxes_list = boxes.tolist()
+        ocr_boxes_list = boxes_list if ocr_boxes is boxes else ocr_boxes.tolist()
+        centers_list = list(map(tuple, centers.tolist()))
+        labels = [
+            f"{self.names.get(int(cls_id), 'vehicle').upper()} {confidence*100:.1f}%"
+            for confidence, cls_id in zip(confs.tolist(), classes.tolist())
+        ]
+        # Frames with nothing to annotate are returned as-is
+        annotated = self._draw_boxes(frame.copy(), boxes_list, labels) if boxes_list else frame
+        # Full-resolution annotated copy for snapshots, drawn only once a frame emits an event
+        snapshot: np.ndarray | None = None
+
+        # OCR every readable vehicle in one batch; centers give temporal consistency
+        # so we only emit when we have a real reading
+        readable = np.flatnonzero(ocr_ok).tolist()
+        ocr_attempts = len(readable)
+        plates: List[str | None] = [None] * len(boxes_list)
+        if readable:
+            ocr_start = time.perf_counter()
+            read = self._read_license_plates(
+                ocr_frame, [ocr_boxes_list[i] for i in readable], [centers_list[i] for i in readable]
             )
+            ocr_duration_ms = (time.perf_counter() - ocr_start) * 1000.0
+            for i, plate_number in zip(readable, read):
+                plates[i] = plate_number
 
-            vehicle_type = self._map_vehicle_type(int(cls_id))
-            # Pass center for temporal consistency so we only emit when we have a real reading
-            ocr_attempts += 1
-            ocr_single_start = time.perf_counter()
-            plate_number = self._read_license_plate(frame, (x1, y1, x2, y2), center)
-            ocr_duration_ms += (time.perf_counter() - ocr_single_start) * 1000.0
+        for plate_number, center, confidence, cls_id in zip(plates, centers_list, confs.tolist(), classes.tolist()):
             if not plate_number:
                 continue
             ocr_success += 1
             if not self._is_new_detection(center, now):
                 continue
-            snapshot_path = self._save_snapshot(annotated)
+            if snapshot is None:
+                # Saved and sent to Telegram, so plates must stay legible: use the original frame
+                snapshot = annotated if ocr_frame is frame else self._draw_boxes(
+                    ocr_frame.copy(), ocr_boxes_list, labels, scale=ocr_frame.shape[0] / height
+                )
+            snapshot_path, snapshot_bytes = self._save_snapshot(snapshot)
             events.append(
                 DetectionEvent(
                     vehicle_number=plate_number,
                     confidence=int(confidence * 100),
                     snapshot_path=snapshot_path,
-                    vehicle_type=vehicle_type,
+                    vehicle_type=self._map_vehicle_type(int(cls_id)),
                     timestamp=datetime.utcnow(),
+                    snapshot_bytes=snapshot_bytes,
                 )
             )
 
-        frame_duration_ms = (time.perf_counter() - frame_start) * 1000.0
+        frame_duration_ms = detect_duration_ms + (time.perf_counter() - frame_start) * 1000.0
         self._record_metrics(
             frame_ms=frame_duration_ms,
             detect_ms=detect_duration_ms,
@@ -486,22 +637,191 @@ class VehicleDetector:
         )
         return annotated, events
 
+    def _draw_boxes(
+        self, image: np.ndarray, boxes: Sequence[Sequence[int]], labels: Sequence[str], scale: float = 1.0
+    ) -> np.ndarray:
+        """Draw labelled vehicle boxes onto `image` in place; `scale` grows strokes and text for larger frames."""
+        thickness = max(2, int(round(2 * scale)))
+        for (x1, y1, x2, y2), text in zip(boxes, labels):
+            cv2.rectangle(image, (x1, y1), (x2, y2), self.COLOR, thickness)
+            cv2.putText(
+                image,
+                text,
+                (x1, max(y1 - int(10 * scale), int(20 * scale))),
+                cv2.FONT_HERSHEY_SIMPLEX,
+                0.6 * scale,
+                self.COLOR,
+                thickness,
+                cv2.LINE_AA,
+            )
+        return image
+
+    @staticmethod
+    def _empty_detections() -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return np.empty((0, 4), dtype=np.float32), np.empty(0, dtype=np.float32), np.empty(0, dtype=np.float32)
+
+    def _detect_boxes_batch(
+        self, frames: Sequence[np.ndarray]
+    ) -> List[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Return one (xyxy, confs, classes) triple of vehicle detections per frame."""
+        if self.session is not None:
+            return self._infer_onnx(frames)
+        # Letterbox once here so Ultralytics' own letterbox is a no-op on the 640x640 input
+        canvases, letterbox = self._letterbox_batch(frames)
+        results = self.model.predict(
+            source=canvases,
+            imgsz=self.INPUT_SIZE,
+            conf=self.confidence_threshold,
+            classes=list(self.VEHICLE_CLASS_IDS),
+            device=self.device,
+            half=self.half,
+            verbose=False,
+        )
+        detections = []
+        for result, (scale, pad_x, pad_y) in zip(results or [], letterbox):
+            boxes = getattr(result, 'boxes', None)
+            if boxes is None or boxes.data is None or boxes.data.shape[0] == 0:
+                detections.append(self._empty_detections())
+                continue
+            # boxes.data is the fused (N, 6) [x1, y1, x2, y2, conf, cls] tensor: filter it
+            # on-device and pay a single device-to-host copy instead of three
+            data = boxes.data
+            data = data[data[:, 4] >= self.confidence_threshold].float().cpu().numpy()
+            detections.append((self._unletterbox(data[:, :4], scale, pad_x, pad_y), data[:, 4], data[:, 5]))
+        return detections
+
+    def _infer_onnx(self, frames: Sequence[np.ndarray]) -> List[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        batch = len(frames)
+        size = self.INPUT_SIZE
+        if self._input_buf.shape[0] < batch:
+            # Only reached when a caller exceeds DETECT_BATCH; grow once and keep the larger buffer
+            self._input_buf = np.zeros((batch, 3, size, size), dtype=np.float32)
+        # Contiguous leading rows of the buffer, so ORT reads it without a copy
+        inputs = self._input_buf[:batch]
+        canvases, letterbox = self._letterbox_batch(frames)
+        for canvas, dst in zip(canvases, inputs):
+            # BGR HWC uint8 -> RGB CHW float32 in [0, 1], written into the preallocated input
+            np.multiply(canvas[:, :, ::-1].transpose(2, 0, 1), np.float32(1.0 / 255.0), out=dst)
+        output = self.session.run(None, {self._input_name: inputs})[0]
+        return [
+            self._decode_onnx(output[i], scale, pad_x, pad_y)
+            for i, (scale, pad_x, pad_y) in enumerate(letterbox)
+        ]
+
+    def _letterbox_batch(
+        self, frames: Sequence[np.ndarray]
+    ) -> Tuple[List[np.ndarray], List[Tuple[float, int, int]]]:
+        """Letterbox each frame into a reused INPUT_SIZE canvas; returns canvases and (scale, pad_x, pad_y)."""
+        size = self.INPUT_SIZE
+        while len(self._det_bufs) < len(frames):
+            self._det_bufs.append(np.full((size, size, 3), 114, dtype=np.uint8))
+        canvases = self._det_bufs[:len(frames)]
+        return canvases, [self._letterbox(frame, canvas) for frame, canvas in zip(frames, canvases)]
+
+    def _letterbox(self, frame: np.ndarray, canvas: np.ndarray) -> Tuple[float, int, int]:
+        """Letterbox `frame` into the uint8 `canvas`; returns (scale, pad_x, pad_y)."""
+        size = self.INPUT_SIZE
+        h, w = frame.shape[:2]
+        scale = min(size / h, size / w)
+        new_w, new_h = int(round(w * scale)), int(round(h * scale))
+        pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+        canvas.fill(114)
+        canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = cv2.resize(
+            frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR
+        )
+        return scale, pad_x, pad_y
+
+    @staticmethod
+    def _unletterbox(xyxy: np.ndarray, scale: float, pad_x: int, pad_y: int) -> np.ndarray:
+        """Map letterboxed xyxy boxes back to original-frame coordinates, in place."""
+        xyxy[:, [0, 2]] = (xyxy[:, [0, 2]] - pad_x) / scale
+        xyxy[:, [1, 3]] = (xyxy[:, [1, 3]] - pad_y) / scale
+        return xyxy
+
+    def _decode_onnx(
+        self, output: np.ndarray, scale: float, pad_x: int, pad_y: int
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        preds = output.T  # (num_anchors, 4 + num_classes)
+        class_scores = preds[:, 4:][:, self._vehicle_ids]
+        best = class_scores.argmax(axis=1)
+        confs = class_scores[np.arange(len(best)), best]
+        keep = confs >= self.confidence_threshold
+        if not keep.any():
+            return self._empty_detections()
+
+        boxes = preds[keep, :4]
+        confs = confs[keep]
+        classes = self._vehicle_ids[best[keep]]
+        xyxy = np.empty_like(boxes)
+        xyxy[:, 0] = boxes[:, 0] - boxes[:, 2] / 2
+        xyxy[:, 1] = boxes[:, 1] - boxes[:, 3] / 2
+        xyxy[:, 2] = boxes[:, 0] + boxes[:, 2] / 2
+        xyxy[:, 3] = boxes[:, 1] + boxes[:, 3] / 2
+
+        order = self._nms(xyxy, confs, classes)
+        xyxy, confs, classes = xyxy[order], confs[order], classes[order]
+        # Undo the letterbox so coordinates refer to the original frame
+        return self._unletterbox(xyxy, scale, pad_x, pad_y), confs, classes.astype(np.float32)
+
+    def _nms(self, xyxy: np.ndarray, confs: np.ndarray, classes: np.ndarray) -> np.ndarray:
+        """Class-aware greedy NMS; returns kept indices sorted by confidence."""
+        # Offset boxes per class so different classes never suppress each other
+        offset = classes[:, None].astype(np.float32) * (self.INPUT_SIZE + 1)
+        boxes = xyxy + offset
+        areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+        order = confs.argsort()[::-1]
+        keep: List[int] = []
+        while order.size:
+            i = order[0]
+            keep.append(int(i))
+            rest = order[1:]
+            ix1 = np.maximum(boxes[i, 0], boxes[rest, 0])
+            iy1 = np.maximum(boxes[i, 1], boxes[rest, 1])
+            ix2 = np.minimum(boxes[i, 2], boxes[rest, 2])
+            iy2 = np.minimum(boxes[i, 3], boxes[rest, 3])
+            inter = np.clip(ix2 - ix1, 0, None) * np.clip(iy2 - iy1, 0, None)
+            iou = inter / (areas[i] + areas[rest] - inter + 1e-7)
+            order = rest[iou <= self.NMS_IOU_THRESHOLD]
+        return np.array(keep, dtype=np.int64)
+
+    def _dedup_cell(self, center: Tuple[float, float]) -> Tuple[int, int]:
+        # Cells are one distance_threshold wide, so any match lies in the 3x3 neighbourhood
+        cell = max(self.distance_threshold, 1.0)
+        return _jit_grid(center[0], center[1], cell)
+
     def _is_new_detection(self, center: Tuple[float, float], timestamp: float) -> bool:
         """De-duplicate detections within a spatial + temporal window."""
-        self._recent = [
-            (c, t) for (c, t) in self._recent if (timestamp - t) <= self.cooldown_seconds
-        ]
-        for prev_center, prev_time in self._recent:
-            if (timestamp - prev_time) > self.cooldown_seconds:
-                continue
-            if self._distance(center, prev_center) <= self.distance_threshold:
-                return False
-        self._recent.append((center, timestamp))
+        self._expire_recent(timestamp)
+        cx, cy = self._dedup_cell(center)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for prev_center, prev_time in self._recent_grid.get((cx + dx, cy + dy), ()):
+                    if (timestamp - prev_time) > self.cooldown_seconds:
+                        continue
+                    if self._distance(center, prev_center) <= self.distance_threshold:
+                        return False
+        cell = (cx, cy)
+        if cell not in self._recent_grid:
+            self._recent_grid[cell] = deque()
+        self._recent_grid[cell].append((center, timestamp))
+        heapq.heappush(self._recent_heap, (timestamp, cell))
         return True
 
+    def _expire_recent(self, timestamp: float) -> None:
+        """Pop de-duplication entries older than the cooldown window off the heap head."""
+        heap = self._recent_heap
+        while heap and (timestamp - heap[0][0]) > self.cooldown_seconds:
+            _, cell = heapq.heappop(heap)
+            # Each cell's deque is in insertion order, so its expired entry is the leftmost
+            entries = self._recent_grid.get(cell)
+            if entries:
+                entries.popleft()
+                if not entries:
+                    del self._recent_grid[cell]
+
     @staticmethod
     def _distance(a: Tuple[float, float], b: Tuple[float, float]) -> float:
-        return float(np.linalg.norm(np.array(a) - np.array(b)))
+        return _jit_hypot(a[0], a[1], b[0], b[1])
 
     def _map_vehicle_type(self, class_id: int) -> str:
         mapping = {
@@ -537,15 +857,31 @@ class VehicleDetector:
             # Metrics must never break detection loop
             pass
 
-    def _save_snapshot(self, frame: np.ndarray) -> str:
+    def _save_snapshot(self, frame: np.ndarray) -> Tuple[str, Future]:
+        """
+        Queue a snapshot write; returns its relative path and a Future of the JPEG bytes.
+
+        `frame` is encoded in the background, so it must not be drawn on afterwards.
+        """
         timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S_%f')
         filename = f"vehicle_{timestamp}.jpg"
         path = os.path.join(self.snapshot_dir, filename)
+        future = self._snapshot_pool.submit(self._write_snapshot, path, frame)
+        rel_path = f"{self.snapshot_rel_dir}/{filename}"
+        return rel_path.replace('\\', '/'), future
+
+    def _write_snapshot(self, path: str, frame: np.ndarray) -> bytes | None:
+        """Encode `frame` as JPEG and write it to `path`; returns the bytes, None on failure."""
         try:
-            cv2.imwrite(path, frame)
+            ok, buf = cv2.imencode('.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), self.SNAPSHOT_JPEG_QUALITY])
+            if not ok:
+                return None
+            data = buf.tobytes()
+            with open(path, 'wb') as fh:
+                fh.write(data)
+            return data
         except Exception as exc:  # pragma: no cover - filesystem failures
             print(f"[ERROR] Failed to save snapshot: {exc}")
-        rel_path = f"{self.snapshot_rel_dir}/{filename}"
-        return rel_path.replace('\\', '/')
+            return None
 
 
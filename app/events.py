@@ -1,15 +1,33 @@
+import logging
+import queue
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy.orm import Session
+
 from .extensions import db, socketio
 from .models import VehicleEvent
-from .alerts import send_telegram
+from .alerts import send_telegram_async
+
+log = logging.getLogger(__name__)
+
+# Detector events are buffered for up to this long / this many, then committed together
+_BATCH_WINDOW_SEC = 0.1
+_BATCH_MAX = 32
+_event_queue: queue.Queue = queue.Queue()
+_writer_lock = threading.Lock()
+_writer_started = False
 
 def compute_is_authorized(authorized_as: str) -> bool:
     return authorized_as in ('Principal', 'Faculty', 'Staff', 'Van')
 
-def make_event_dict(e: VehicleEvent):
+def make_event_dict(e: VehicleEvent, iso_time: bool = True):
+    # iso_time=False leaves the datetime for serializers (orjson) that encode it natively
     return {
         'id': e.id,
         'vehicle_number': e.vehicle_number,
-        'time_stamp': e.time_stamp.isoformat(),
+        'time_stamp': e.time_stamp.isoformat() if iso_time else e.time_stamp,
         'status': e.status,
         'authorized_as': e.authorized_as,
         'is_authorized': e.is_authorized,
@@ -19,10 +37,10 @@ def make_event_dict(e: VehicleEvent):
         'vehicle_type': getattr(e, 'vehicle_type', 'Vehicle')
     }
 
-def emit_vehicle_event(data):
+def _build_event(data) -> VehicleEvent:
     auth_as = data.get('authorized_as', 'Unauthorized')
     is_auth = compute_is_authorized(auth_as)
-    e = VehicleEvent(
+    return VehicleEvent(
         vehicle_number=data['vehicle_number'],
         status=data.get('status', 'IN'),
         authorized_as=auth_as,
@@ -31,11 +49,82 @@ def emit_vehicle_event(data):
         snapshot_path=data.get('snapshot_path', ''),
         vehicle_type=data.get('vehicle_type', 'Vehicle')
     )
-    db.session.add(e)
-    db.session.commit()
+
+def _after_commit(app, e: VehicleEvent, snapshot_bytes=None):
+    """Queue the Telegram alert for unauthorized vehicles and notify live clients."""
     if not e.is_authorized:
-        if send_telegram(e):
-            e.alert_sent = True
-            db.session.commit()
+        event_id = e.id
+        send_telegram_async(e, snapshot_bytes=snapshot_bytes).add_done_callback(
+            lambda future: _mark_alert_sent(app, event_id, future)
+        )
     socketio.emit('vehicle_event', make_event_dict(e), namespace='/ws/live')
+
+def emit_vehicle_event(data):
+    """Persist one event immediately and return it (used where the caller needs the row)."""
+    e = _build_event(data)
+    db.session.add(e)
+    db.session.commit()
+    _after_commit(current_app._get_current_object(), e, data.get('snapshot_bytes'))
     return e
+
+def queue_vehicle_event(data):
+    """
+    Hand a detector event to the background writer and return immediately.
+
+    The writer commits buffered events in one transaction, then sends alerts
+    and the `vehicle_event` broadcast for each, so clients reloading on the
+    broadcast always see the new rows.
+    """
+    _ensure_writer(current_app._get_current_object())
+    _event_queue.put(data)
+
+def _ensure_writer(app):
+    global _writer_started
+    if _writer_started:
+        return
+    with _writer_lock:
+        if not _writer_started:
+            threading.Thread(target=_writer_loop, args=(app,), name='event-writer', daemon=True).start()
+            _writer_started = True
+
+def _writer_loop(app):
+    while True:
+        batch = [_event_queue.get()]
+        deadline = time.monotonic() + _BATCH_WINDOW_SEC
+        while len(batch) < _BATCH_MAX:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_event_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        with app.app_context():
+            try:
+                _commit_batch(app, batch)
+            except Exception as exc:  # pragma: no cover - runtime failure guard
+                log.error("Failed to store %d vehicle event(s): %s", len(batch), exc)
+
+def _commit_batch(app, batch):
+    events = [_build_event(data) for data in batch]
+    # add_all + one commit: a single transaction (one fsync) with ids populated for alerts.
+    # A private session that keeps the flushed values after commit, so the alerts and
+    # broadcasts below don't refresh each expired row with its own SELECT
+    with Session(db.engine, expire_on_commit=False) as session:
+        session.add_all(events)
+        session.commit()
+    for e, data in zip(events, batch):
+        _after_commit(app, e, data.get('snapshot_bytes'))
+
+
+def _mark_alert_sent(app, event_id, future):
+    """Persist `alert_sent` once the background Telegram send succeeds."""
+    try:
+        # None means the alert was coalesced with an earlier one; only a real send counts
+        if future.result() is not True:
+            return
+        with app.app_context():
+            VehicleEvent.query.filter_by(id=event_id).update({'alert_sent': True})
+            db.session.commit()
+    except Exception as exc:  # pragma: no cover - runtime failure guard
+        log.error("Failed to record alert for event %s: %s", event_id, exc)
@@ -1,21 +1,13 @@
 from __future__ import annotations
 
 import time
-from collections import deque
-from dataclasses import dataclass
 from threading import Lock
-from typing import Deque, Dict, List
+from typing import Dict
 
+import numpy as np
 
-@dataclass
-class FrameSample:
-    timestamp: float
-    frame_ms: float
-    detect_ms: float
-    ocr_ms: float
-    events: int
-    ocr_attempts: int
-    ocr_success: int
+# Column layout of the sample ring buffer
+_FRAME_MS, _DETECT_MS, _OCR_MS, _EVENTS, _OCR_ATTEMPTS, _OCR_SUCCESS = range(6)
 
 
 class PerformanceTracker:
@@ -26,7 +18,10 @@ class PerformanceTracker:
 
     def __init__(self, window: int = 180):
         self.window = max(window, 1)
-        self._samples: Deque[FrameSample] = deque(maxlen=self.window)
+        # One row per frame: frame_ms, detect_ms, ocr_ms, events, ocr_attempts, ocr_success
+        self._buf = np.zeros((self.window, 6), dtype=np.float64)
+        self._head = 0
+        self._count = 0
         self._lock = Lock()
 
         self._total_frames = 0
@@ -45,24 +40,21 @@ class PerformanceTracker:
         ocr_attempts: int,
         ocr_success: int,
     ) -> None:
-        sample = FrameSample(
-            timestamp=time.time(),
-            frame_ms=max(frame_ms, 0.0),
-            detect_ms=max(detect_ms, 0.0),
-            ocr_ms=max(ocr_ms, 0.0),
-            events=max(events, 0),
-            ocr_attempts=max(ocr_attempts, 0),
-            ocr_success=max(ocr_success, 0),
-        )
+        events = max(events, 0)
+        ocr_attempts = max(ocr_attempts, 0)
+        ocr_success = max(ocr_success, 0)
+        row = (max(frame_ms, 0.0), max(detect_ms, 0.0), max(ocr_ms, 0.0), events, ocr_attempts, ocr_success)
         with self._lock:
-            self._samples.append(sample)
+            self._buf[self._head] = row
+            self._head = (self._head + 1) % self.window
+            self._count = min(self._count + 1, self.window)
             self._total_frames += 1
-            self._total_events += sample.events
-            self._total_ocr_attempts += sample.ocr_attempts
-            self._total_ocr_success += sample.ocr_success
+            self._total_events += events
+            self._total_ocr_attempts += ocr_attempts
+            self._total_ocr_success += ocr_success
 
-    def _summarize_recent(self, samples: List[FrameSample]) -> Dict[str, float]:
-        if not samples:
+    def _summarize_recent(self, samples: np.ndarray) -> Dict[str, float]:
+        if not len(samples):
             return {
                 "fps": 0.0,
                 "frame_ms": 0.0,
@@ -73,16 +65,16 @@ class PerformanceTracker:
                 "sample_size": 0,
             }
 
-        frame_time_ms = sum(s.frame_ms for s in samples)
-        detect_time_ms = sum(s.detect_ms for s in samples)
-        ocr_time_ms = sum(s.ocr_ms for s in samples)
-        total_events = sum(s.events for s in samples)
-        total_attempts = sum(s.ocr_attempts for s in samples)
-        total_success = sum(s.ocr_success for s in samples)
+        # Every column summed in a single vectorized pass
+        totals = samples.sum(axis=0).tolist()
+        frame_time_ms = totals[_FRAME_MS]
+        total_events = totals[_EVENTS]
+        total_attempts = totals[_OCR_ATTEMPTS]
+        total_success = totals[_OCR_SUCCESS]
 
         avg_frame_ms = frame_time_ms / len(samples)
-        avg_detect_ms = detect_time_ms / len(samples)
-        avg_ocr_ms = ocr_time_ms / len(samples)
+        avg_detect_ms = totals[_DETECT_MS] / len(samples)
+        avg_ocr_ms = totals[_OCR_MS] / len(samples)
 
         fps = 0.0
         if frame_time_ms > 0:
@@ -108,7 +100,8 @@ class PerformanceTracker:
 
     def snapshot(self) -> Dict[str, object]:
         with self._lock:
-            samples = list(self._samples)
+            # Row order is irrelevant to the sums, so the valid rows are copied as-is
+            samples = self._buf[:self._count].copy()
             total_frames = self._total_frames
             total_events = self._total_events
             total_attempts = self._total_ocr_attempts
@@ -19,9 +19,16 @@ class Whitelist(db.Model):
     authorized_as = db.Column(db.String(20), nullable=False)
 
 class VehicleEvent(db.Model):
+    # Composites serve the dashboard's plate/role filters ordered by time; the plate
+    # composite also covers plate-only lookups and the role one the vans export prefilter.
+    # Event indexes build CONCURRENTLY on Postgres so adding one never blocks inserts
+    __table_args__ = (
+        db.Index('ix_event_vehicle_time', 'vehicle_number', 'time_stamp', postgresql_concurrently=True),
+        db.Index('ix_event_auth_time', 'authorized_as', 'time_stamp', postgresql_concurrently=True),
+    )
     id = db.Column(db.Integer, primary_key=True)
-    vehicle_number = db.Column(db.String(20), index=True, nullable=False)
-    time_stamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    vehicle_number = db.Column(db.String(20), nullable=False)
+    time_stamp = db.Column(db.DateTime, default=datetime.utcnow)
     status = db.Column(db.String(3), nullable=False)  # IN | OUT
     authorized_as = db.Column(db.String(20), nullable=False)  # Principal/Faculty/Staff/Van/Unauthorized
     is_authorized = db.Column(db.Boolean, default=False, index=True)
@@ -29,3 +36,22 @@ class VehicleEvent(db.Model):
     alert_sent = db.Column(db.Boolean, default=False)
     snapshot_path = db.Column(db.String(255))
     vehicle_type = db.Column(db.String(20), default='Vehicle')
+
+# Default listing: time range + status/authorized predicates, newest first, without a sort
+# step; also replaces the standalone time_stamp index
+db.Index(
+    'ix_vehicle_event_ts_status_auth',
+    VehicleEvent.time_stamp.desc(),
+    VehicleEvent.status,
+    VehicleEvent.is_authorized,
+    postgresql_concurrently=True,
+)
+
+# Plate prefix search filters on upper(vehicle_number) LIKE 'X%'; varchar_pattern_ops lets
+# Postgres serve that from an index (SQLite cannot use expression indexes for LIKE)
+db.Index(
+    'ix_event_vehicle_upper',
+    db.func.upper(VehicleEvent.vehicle_number).label('vehicle_upper'),
+    postgresql_ops={'vehicle_upper': 'varchar_pattern_ops'},
+    postgresql_concurrently=True,
+).ddl_if(dialect='postgresql')
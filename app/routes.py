@@ -1,21 +1,45 @@
 from datetime import datetime
-from flask import Blueprint, render_template, request, jsonify, send_file, Response
+from functools import lru_cache
+from flask import Blueprint, render_template, request, jsonify, send_file, Response, stream_with_context
 from flask_login import login_required, current_user
 from werkzeug.security import generate_password_hash
-from io import BytesIO
+from io import BytesIO, StringIO
 import csv
 from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase.pdfmetrics import stringWidth
 from reportlab.pdfgen import canvas
+from sqlalchemy import delete, exists, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import load_only, raiseload
 
 from .extensions import db, csrf
 from .models import VehicleEvent, Whitelist, User
-from .utils import require_role
+from .utils import require_role, _build_event_query
 from .camera import camera
 from .events import emit_vehicle_event, make_event_dict
 from .metrics import performance_tracker
+from .whitelist_cache import whitelist_cache
+
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    orjson = None
 
 main_bp = Blueprint('main', __name__)
 
+# Columns actually read by the exports (selected as Core rows); list_events also needs what make_event_dict adds
+_EXPORT_COLUMNS = (
+    VehicleEvent.id, VehicleEvent.vehicle_number, VehicleEvent.time_stamp, VehicleEvent.status,
+    VehicleEvent.authorized_as, VehicleEvent.is_authorized, VehicleEvent.confidence, VehicleEvent.alert_sent,
+)
+_LIST_COLUMNS = _EXPORT_COLUMNS + (VehicleEvent.snapshot_path, VehicleEvent.vehicle_type)
+# PDF table layout: x offset of each column and the report range timestamp format
+_PDF_COLUMN_X = (40, 80, 160, 280, 330, 410, 450, 490)
+_PDF_HEADERS = ('S.No', 'Vehicle', 'Time', 'Status', 'Auth As', 'Auth?', 'Conf', 'Alert')
+# Report titles/labels are fixed strings, so their AFM width lookups are memoized
+_string_width = lru_cache(maxsize=64)(stringWidth)
+_ROW_TIME_FMT = '%Y-%m-%d %H:%M'
+
 @main_bp.route('/')
 @login_required
 def dashboard():
@@ -31,7 +55,7 @@ def users_page():
         password = request.form.get('password','').strip()
         role = request.form.get('role','viewer')
         if username and password:
-            if not User.query.filter_by(username=username).first():
+            if not db.session.query(exists().where(User.username == username)).scalar():
                 u = User(username=username, role=role, password_hash=generate_password_hash(password))
                 db.session.add(u); db.session.commit()
     return render_template('users.html', users=User.query.all())
@@ -42,7 +66,7 @@ def users_page():
 def delete_user(uid):
     if current_user.id == uid:
         return ('Cannot delete self', 400)
-    u = User.query.get(uid)
+    u = db.session.get(User, uid)
     if u:
         db.session.delete(u); db.session.commit()
     return ('', 204)
@@ -56,80 +80,62 @@ def whitelist_page():
         plate = request.form.get('vehicle_number','').upper().strip()
         auth_as = request.form.get('authorized_as','Staff')
         if plate:
-            w = Whitelist.query.filter_by(vehicle_number=plate).first()
-            if not w:
-                w = Whitelist(vehicle_number=plate, authorized_as=auth_as)
-                db.session.add(w)
-            else:
-                w.authorized_as = auth_as
+            _upsert_whitelist(plate, auth_as)
             db.session.commit()
+            whitelist_cache.clear()
     return render_template('whitelist.html', items=Whitelist.query.order_by(Whitelist.vehicle_number).all())
 
+# Dialects with INSERT ... ON CONFLICT DO UPDATE
+_UPSERT_INSERT = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+
+def _upsert_whitelist(plate, auth_as):
+    insert = _UPSERT_INSERT.get(db.session.get_bind().dialect.name)
+    if insert is not None:
+        # One statement, and no race between concurrent admins adding the same plate
+        stmt = insert(Whitelist).values(vehicle_number=plate, authorized_as=auth_as).on_conflict_do_update(
+            index_elements=[Whitelist.vehicle_number], set_={'authorized_as': auth_as}
+        )
+        db.session.execute(stmt)
+        return
+    # Other backends: branch on an EXISTS and update in place, so no Whitelist row is loaded
+    if not db.session.query(exists().where(Whitelist.vehicle_number == plate)).scalar():
+        db.session.add(Whitelist(vehicle_number=plate, authorized_as=auth_as))
+    else:
+        db.session.execute(
+            update(Whitelist).where(Whitelist.vehicle_number == plate).values(authorized_as=auth_as)
+        )
+
 @main_bp.route('/admin/whitelist/delete/<int:wid>', methods=['POST'])
 @login_required
 @require_role('admin')
 def whitelist_delete(wid):
-    w = Whitelist.query.get(wid)
+    w = db.session.get(Whitelist, wid)
     if w:
         db.session.delete(w); db.session.commit()
+        whitelist_cache.clear()
     return ('', 204)
 
 # API
 @main_bp.route('/api/events', methods=['GET'])
 @login_required
 def list_events():
-    q = VehicleEvent.query
-    v = request.args.get('vehicle')
-    if v: q = q.filter(VehicleEvent.vehicle_number.ilike(f"%{v}%"))
-    status = request.args.get('status')
-    if status in ('IN','OUT'): q = q.filter(VehicleEvent.status==status)
-    auth = request.args.get('authorized')
-    if auth is not None: q = q.filter(VehicleEvent.is_authorized==(auth.lower()=='true'))
-    role = request.args.get('role')
-    if role: q = q.filter(VehicleEvent.authorized_as==role)
-    vehicle_type = request.args.get('vehicle_type')
-    if vehicle_type: q = q.filter(VehicleEvent.vehicle_type==vehicle_type)
-    df = request.args.get('date_from'); dt = request.args.get('date_to')
-    # If no date filters, default to today
-    if not df and not dt:
-        today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        today_end = datetime.now().replace(hour=23, minute=59, second=59, microsecond=999999)
-        q = q.filter(VehicleEvent.time_stamp >= today_start)
-        q = q.filter(VehicleEvent.time_stamp <= today_end)
-    else:
-        def parse_date(s):
-            try: 
-                d = datetime.fromisoformat(s.replace('Z', '+00:00'))
-                return d
-            except Exception: 
-                try:
-                    d = datetime.fromisoformat(s)
-                    return d
-                except:
-                    return None
-        dfrom = parse_date(df) if df else None
-        dto = parse_date(dt) if dt else None
-        if dfrom: 
-            if dfrom.tzinfo:
-                dfrom = dfrom.replace(tzinfo=None)
-            q = q.filter(VehicleEvent.time_stamp >= dfrom)
-        if dto:   
-            if dto.tzinfo:
-                dto = dto.replace(tzinfo=None)
-            if dto.hour == 0 and dto.minute == 0 and dto.second == 0:
-                dto = dto.replace(hour=23, minute=59, second=59, microsecond=999999)
-            q = q.filter(VehicleEvent.time_stamp <= dto)
+    q, _, _ = _build_event_query(
+        request.args, VehicleEvent.query.options(load_only(*_LIST_COLUMNS), raiseload('*')), default_today=True
+    )
     rows = q.order_by(VehicleEvent.time_stamp.desc()).limit(1000).all()
-    return jsonify([make_event_dict(r) for r in rows])
+    if orjson is None:
+        return jsonify([make_event_dict(r) for r in rows])
+    # Naive datetimes serialize exactly like isoformat(), so the payload is unchanged
+    return Response(orjson.dumps([make_event_dict(r, iso_time=False) for r in rows]), mimetype='application/json')
 
 @main_bp.route('/api/events/<int:event_id>', methods=['DELETE'])
 @login_required
 @require_role('admin')
 def delete_event(event_id):
-    e = VehicleEvent.query.get(event_id)
-    if e:
-        db.session.delete(e)
-        db.session.commit()
+    # Single DELETE; the row is never loaded (events have no relationships or ORM cascades)
+    result = db.session.execute(delete(VehicleEvent).where(VehicleEvent.id == event_id))
+    db.session.commit()
+    if result.rowcount:
         return ('', 204)
     return jsonify({'error': 'Event not found'}), 404
 
@@ -137,235 +143,139 @@ def delete_event(event_id):
 @login_required
 @require_role('admin')
 def export_csv():
-    q = VehicleEvent.query.order_by(VehicleEvent.time_stamp.desc()).limit(5000).all()
-    output = BytesIO()
-    writer = csv.writer(output)
-    writer.writerow(['S.No','Vehicle No','Time','Status','Authorized As','Authorized','Confidence','Alert'])
-    for i,e in enumerate(q, start=1):
-        writer.writerow([i, e.vehicle_number, e.time_stamp, e.status, e.authorized_as, e.is_authorized, e.confidence, 'Alert Sent' if e.alert_sent else 'No'])
-    output.seek(0)
-    return send_file(output, mimetype='text/csv', as_attachment=True, download_name='events.csv')
+    chunk_rows = 500
+    def generate():
+        # Rows are fetched chunk_rows at a time and each chunk is flushed as soon as it is written
+        buf = StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(['S.No','Vehicle No','Time','Status','Authorized As','Authorized','Confidence','Alert'])
+        stmt = select(*_EXPORT_COLUMNS).order_by(VehicleEvent.time_stamp.desc()).execution_options(yield_per=chunk_rows)
+        for i,e in enumerate(db.session.execute(stmt), start=1):
+            ts = e.time_stamp
+            time_str = f"{ts.year:04d}-{ts.month:02d}-{ts.day:02d} {ts.hour:02d}:{ts.minute:02d}:{ts.second:02d}"
+            writer.writerow([i, e.vehicle_number, time_str, e.status, e.authorized_as, e.is_authorized, e.confidence, 'Alert Sent' if e.alert_sent else 'No'])
+            if i % chunk_rows == 0:
+                yield buf.getvalue().encode()
+                buf.seek(0); buf.truncate(0)
+        yield buf.getvalue().encode()
+    return Response(stream_with_context(generate()), mimetype='text/csv',
+                    headers={'Content-Disposition': 'attachment; filename=events.csv'})
 
 @main_bp.route('/api/events/export.pdf')
 @login_required
 @require_role('admin')
 def export_pdf():
     # Apply same filters as list_events
-    q = VehicleEvent.query
-    v = request.args.get('vehicle')
-    if v: q = q.filter(VehicleEvent.vehicle_number.ilike(f"%{v}%"))
-    status = request.args.get('status')
-    if status in ('IN','OUT'): q = q.filter(VehicleEvent.status==status)
-    auth = request.args.get('authorized')
-    if auth is not None: q = q.filter(VehicleEvent.is_authorized==(auth.lower()=='true'))
-    role = request.args.get('role')
-    if role: q = q.filter(VehicleEvent.authorized_as==role)
-    vehicle_type = request.args.get('vehicle_type')
-    if vehicle_type: q = q.filter(VehicleEvent.vehicle_type==vehicle_type)
-    df = request.args.get('date_from'); dt = request.args.get('date_to')
-    def parse_date(s):
-        try: 
-            d = datetime.fromisoformat(s.replace('Z', '+00:00'))
-            return d
-        except Exception: 
-            try:
-                d = datetime.fromisoformat(s)
-                return d
-            except:
-                return None
-    dfrom = parse_date(df) if df else None
-    dto = parse_date(dt) if dt else None
-    if dfrom: 
-        if dfrom.tzinfo:
-            dfrom = dfrom.replace(tzinfo=None)
-        q = q.filter(VehicleEvent.time_stamp >= dfrom)
-    if dto:   
-        if dto.tzinfo:
-            dto = dto.replace(tzinfo=None)
-        if dto.hour == 0 and dto.minute == 0 and dto.second == 0:
-            dto = dto.replace(hour=23, minute=59, second=59, microsecond=999999)
-        q = q.filter(VehicleEvent.time_stamp <= dto)
-    
-    events = q.order_by(VehicleEvent.time_stamp.desc()).limit(1000).all()
-    total_count = len(events)
-    today = datetime.now().strftime('%Y-%m-%d')
-    if dfrom:
-        today = dfrom.strftime('%Y-%m-%d')
-    elif dto:
-        today = dto.strftime('%Y-%m-%d')
-    
-    def range_text(dfrom, dto):
-        fmt = '%Y-%m-%d %H:%M'
-        start = dfrom.strftime(fmt) if dfrom else 'Not specified'
-        end = dto.strftime(fmt) if dto else 'Not specified'
-        return f"Data downloaded from {start} to {end}"
-
-    buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=A4)
-    width, height = A4
-    y = height - 40
-    # Title centered
-    title = 'Vehicle Events Report'
-    title_width = c.stringWidth(title, 'Helvetica-Bold', 14)
-    c.setFont('Helvetica-Bold', 14); c.drawString((width - title_width) / 2, y, title); y -= 20
-    # Total count centered
-    total_text = f'Total Vehicles Detected: {total_count}'
-    total_width = c.stringWidth(total_text, 'Helvetica-Bold', 12)
-    c.setFont('Helvetica-Bold', 12); c.drawString((width - total_width) / 2, y, total_text); y -= 20
-    # Download date and time (right aligned)
-    download_time = datetime.now().strftime('Downloaded on: %Y-%m-%d at %H:%M:%S')
-    download_width = c.stringWidth(download_time, 'Helvetica', 9)
-    c.setFont('Helvetica', 9); c.drawString(width - download_width - 40, y, download_time); y -= 20
-    range_info = range_text(dfrom, dto)
-    range_width = c.stringWidth(range_info, 'Helvetica', 9)
-    c.drawString((width - range_width) / 2, y, range_info); y -= 20
-    c.setFont('Helvetica-Bold', 10)
-    # Header row with proper alignment
-    c.drawString(40, y, 'S.No')
-    c.drawString(80, y, 'Vehicle')
-    c.drawString(160, y, 'Time')
-    c.drawString(280, y, 'Status')
-    c.drawString(330, y, 'Auth As')
-    c.drawString(410, y, 'Auth?')
-    c.drawString(450, y, 'Conf')
-    c.drawString(490, y, 'Alert')
-    y -= 15
-    c.setFont('Helvetica', 9)
-    # Draw line separator
-    c.line(40, y, width - 40, y)
-    y -= 10
-    # Reverse S.No (highest first)
-    for idx, e in enumerate(events):
-        if y < 60:
-            c.showPage(); y = height - 40
-            c.setFont('Helvetica', 9)
-        serial = total_count - idx
-        c.drawString(40, y, str(serial))
-        # Truncate vehicle number if too long
-        vehicle_num = e.vehicle_number[:15] if len(e.vehicle_number) > 15 else e.vehicle_number
-        c.drawString(80, y, vehicle_num)
-        time_str = e.time_stamp.strftime('%Y-%m-%d %H:%M')
-        c.drawString(160, y, time_str)
-        c.drawString(280, y, e.status)
-        auth_as = e.authorized_as[:10] if len(e.authorized_as) > 10 else e.authorized_as
-        c.drawString(330, y, auth_as)
-        c.drawString(410, y, 'Y' if e.is_authorized else 'N')
-        c.drawString(450, y, f"{e.confidence}%")
-        c.drawString(490, y, '⚠' if e.alert_sent else '-')
-        y -= 12
-    c.save()
-    buffer.seek(0)
-    filename = f'{today}_vehicle.pdf'
-    return send_file(buffer, mimetype='application/pdf', as_attachment=True, download_name=filename)
+    q, dfrom, dto = _build_event_query(request.args, select(*_EXPORT_COLUMNS))
+    events = _stream_report_rows(q)
+    return _render_events_pdf(events, 'Vehicle Events Report', 'Total Vehicles Detected', 'vehicle', dfrom, dto)
 
 @main_bp.route('/api/events/export_vans.pdf')
 @login_required
 @require_role('admin')
 def export_vans_pdf():
     # Apply same filters as list_events, but filter for vans
-    q = VehicleEvent.query.filter_by(authorized_as='Van')
-    v = request.args.get('vehicle')
-    if v: q = q.filter(VehicleEvent.vehicle_number.ilike(f"%{v}%"))
-    status = request.args.get('status')
-    if status in ('IN','OUT'): q = q.filter(VehicleEvent.status==status)
-    auth = request.args.get('authorized')
-    if auth is not None: q = q.filter(VehicleEvent.is_authorized==(auth.lower()=='true'))
-    vehicle_type = request.args.get('vehicle_type')
-    if vehicle_type: q = q.filter(VehicleEvent.vehicle_type==vehicle_type)
-    df = request.args.get('date_from'); dt = request.args.get('date_to')
-    def parse_date(s):
-        try: 
-            d = datetime.fromisoformat(s.replace('Z', '+00:00'))
-            return d
-        except Exception: 
-            try:
-                d = datetime.fromisoformat(s)
-                return d
-            except:
-                return None
-    dfrom = parse_date(df) if df else None
-    dto = parse_date(dt) if dt else None
-    if dfrom: 
-        if dfrom.tzinfo:
-            dfrom = dfrom.replace(tzinfo=None)
-        q = q.filter(VehicleEvent.time_stamp >= dfrom)
-    if dto:   
-        if dto.tzinfo:
-            dto = dto.replace(tzinfo=None)
-        if dto.hour == 0 and dto.minute == 0 and dto.second == 0:
-            dto = dto.replace(hour=23, minute=59, second=59, microsecond=999999)
-        q = q.filter(VehicleEvent.time_stamp <= dto)
-    
-    events = q.order_by(VehicleEvent.time_stamp.desc()).limit(1000).all()
-    total_count = len(events)
+    base_q = select(*_EXPORT_COLUMNS).filter_by(authorized_as='Van')
+    q, dfrom, dto = _build_event_query(request.args, base_q, filter_role=False)
+    events = _stream_report_rows(q)
+    return _render_events_pdf(events, 'Van Events Report', 'Total Vans Detected', 'vans', dfrom, dto)
+
+def _stream_report_rows(stmt, limit=1000):
+    """Execute a report select and return its newest-first Row tuples, fetched 200 at a time."""
+    stmt = stmt.order_by(VehicleEvent.time_stamp.desc()).limit(limit).execution_options(yield_per=200)
+    return db.session.execute(stmt)
+
+def _range_text(dfrom, dto):
+    start = dfrom.strftime(_ROW_TIME_FMT) if dfrom else 'Not specified'
+    end = dto.strftime(_ROW_TIME_FMT) if dto else 'Not specified'
+    return f"Data downloaded from {start} to {end}"
+
+def _define_pdf_header_form(c, width):
+    """Record the column header strip and separator once per document as a form XObject."""
+    c.beginForm('hdr', lowerx=0, lowery=-20, upperx=width, uppery=15)
+    c.setFont('Helvetica-Bold', 10)
+    for x, label in zip(_PDF_COLUMN_X, _PDF_HEADERS):
+        c.drawString(x, 0, label)
+    c.line(40, -15, width - 40, -15)
+    c.endForm()
+
+def _draw_pdf_header(c, y):
+    """Place the header form with its baseline at `y`; returns the y of the first row."""
+    c.saveState()
+    c.translate(0, y)
+    c.doForm('hdr')
+    c.restoreState()
+    return y - 25
+
+def _render_events_pdf(events, title, count_label, filename_suffix, dfrom, dto):
+    """Render `events` (newest first) as the A4 events report and send it as a download."""
     today = datetime.now().strftime('%Y-%m-%d')
     if dfrom:
         today = dfrom.strftime('%Y-%m-%d')
     elif dto:
         today = dto.strftime('%Y-%m-%d')
-    
-    def range_text(dfrom, dto):
-        fmt = '%Y-%m-%d %H:%M'
-        start = dfrom.strftime(fmt) if dfrom else 'Not specified'
-        end = dto.strftime(fmt) if dto else 'Not specified'
-        return f"Data downloaded from {start} to {end}"
 
     buffer = BytesIO()
     c = canvas.Canvas(buffer, pagesize=A4)
     width, height = A4
+    # Forms must be recorded on an empty graphics stream, before anything is drawn
+    _define_pdf_header_form(c, width)
     y = height - 40
     # Title centered
-    title = 'Van Events Report'
-    title_width = c.stringWidth(title, 'Helvetica-Bold', 14)
+    title_width = _string_width(title, 'Helvetica-Bold', 14)
     c.setFont('Helvetica-Bold', 14); c.drawString((width - title_width) / 2, y, title); y -= 20
-    # Total count centered
-    total_text = f'Total Vans Detected: {total_count}'
-    total_width = c.stringWidth(total_text, 'Helvetica-Bold', 12)
-    c.setFont('Helvetica-Bold', 12); c.drawString((width - total_width) / 2, y, total_text); y -= 20
+    # Total count centered; a form filled in once the rows are drawn, so no COUNT query is needed
+    c.saveState(); c.translate(width / 2, y); c.doForm('total'); c.restoreState(); y -= 20
     # Download date and time (right aligned)
     download_time = datetime.now().strftime('Downloaded on: %Y-%m-%d at %H:%M:%S')
     download_width = c.stringWidth(download_time, 'Helvetica', 9)
     c.setFont('Helvetica', 9); c.drawString(width - download_width - 40, y, download_time); y -= 20
-    range_info = range_text(dfrom, dto)
+    range_info = _range_text(dfrom, dto)
     range_width = c.stringWidth(range_info, 'Helvetica', 9)
     c.drawString((width - range_width) / 2, y, range_info); y -= 20
-    c.setFont('Helvetica-Bold', 10)
-    # Header row with proper alignment
-    c.drawString(40, y, 'S.No')
-    c.drawString(80, y, 'Vehicle')
-    c.drawString(160, y, 'Time')
-    c.drawString(280, y, 'Status')
-    c.drawString(330, y, 'Auth As')
-    c.drawString(410, y, 'Auth?')
-    c.drawString(450, y, 'Conf')
-    c.drawString(490, y, 'Alert')
-    y -= 15
-    c.setFont('Helvetica', 9)
-    # Draw line separator
-    c.line(40, y, width - 40, y)
-    y -= 10
-    # Reverse S.No (highest first)
-    for idx, e in enumerate(events):
+    y = _draw_pdf_header(c, y)
+    # One text object per page: cells move its origin instead of issuing a drawString each
+    t = c.beginText()
+    t.setFont('Helvetica', 9)
+    # S.No counts up from the newest event
+    total_count = 0
+    for serial, e in enumerate(events, start=1):
         if y < 60:
-            c.showPage(); y = height - 40
-            c.setFont('Helvetica', 9)
-        serial = total_count - idx
-        c.drawString(40, y, str(serial))
-        # Truncate vehicle number if too long
-        vehicle_num = e.vehicle_number[:15] if len(e.vehicle_number) > 15 else e.vehicle_number
-        c.drawString(80, y, vehicle_num)
-        time_str = e.time_stamp.strftime('%Y-%m-%d %H:%M')
-        c.drawString(160, y, time_str)
-        c.drawString(280, y, e.status)
-        auth_as = e.authorized_as[:10] if len(e.authorized_as) > 10 else e.authorized_as
-        c.drawString(330, y, auth_as)
-        c.drawString(410, y, 'Y' if e.is_authorized else 'N')
-        c.drawString(450, y, f"{e.confidence}%")
-        c.drawString(490, y, '⚠' if e.alert_sent else '-')
+            c.drawText(t)
+            c.showPage()
+            # Continuation pages repeat the column header from the shared form
+            y = _draw_pdf_header(c, height - 40)
+            t = c.beginText()
+            t.setFont('Helvetica', 9)
+        total_count = serial
+        # Integer formatting instead of strftime, which goes through the C locale layer per call
+        ts = e.time_stamp
+        time_str = f"{ts.year:04d}-{ts.month:02d}-{ts.day:02d} {ts.hour:02d}:{ts.minute:02d}"
+        # Truncate vehicle number / role if too long
+        cells = (
+            str(serial),
+            e.vehicle_number[:15],
+            time_str,
+            e.status,
+            e.authorized_as[:10],
+            'Y' if e.is_authorized else 'N',
+            f"{e.confidence}%",
+            '⚠' if e.alert_sent else '-',
+        )
+        for x, cell in zip(_PDF_COLUMN_X, cells):
+            t.setTextOrigin(x, y)
+            t.textOut(cell)
         y -= 12
+    c.drawText(t)
+    # Close the last page so the deferred total form starts on an empty stream
+    c.showPage()
+    c.beginForm('total', lowerx=-width / 2, lowery=-5, upperx=width / 2, uppery=15)
+    c.setFont('Helvetica-Bold', 12)
+    c.drawCentredString(0, 0, f'{count_label}: {total_count}')
+    c.endForm()
     c.save()
     buffer.seek(0)
-    filename = f'{today}_vans.pdf'
+    filename = f'{today}_{filename_suffix}.pdf'
     return send_file(buffer, mimetype='application/pdf', as_attachment=True, download_name=filename)
 
 @main_bp.route('/api/events/simulate', methods=['POST'])
@@ -378,8 +288,7 @@ def simulate_event():
     status = (data.get('status') or 'IN').upper()
     if not plate:
         return jsonify({'error':'vehicle_number required'}), 400
-    w = Whitelist.query.filter_by(vehicle_number=plate).first()
-    auth_as = w.authorized_as if w else data.get('authorized_as','Unauthorized')
+    auth_as = whitelist_cache.get(plate) or data.get('authorized_as','Unauthorized')
     payload = {
         'vehicle_number': plate,
         'status': status if status in ('IN','OUT') else 'IN',
@@ -398,6 +307,9 @@ def performance_metrics():
     return jsonify(performance_tracker.snapshot())
 
 # Camera endpoints
+# Part header; the leading CRLF closes the previous part (a preamble before the first one)
+_MJPEG_PART_HEADER = b'\r\n--frame\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n'
+
 @main_bp.route('/camera/start', methods=['POST'])
 @login_required
 def camera_start():
@@ -417,9 +329,8 @@ def camera_stop():
 def video_feed():
     if not camera.running: camera.start()
     def gen():
-        boundary = b'--frame\r\n'
         for jpeg in camera.frames():
-            yield (boundary + b'Content-Type: image/jpeg\r\n' +
-                   b'Content-Length: ' + str(len(jpeg)).encode() + b'\r\n\r\n' +
-                   jpeg + b'\r\n')
+            # Header and JPEG go out as separate chunks so the frame bytes are never copied
+            yield _MJPEG_PART_HEADER % len(jpeg)
+            yield jpeg
     return Response(gen(), mimetype='multipart/x-mixed-replace; boundary=frame')
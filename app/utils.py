@@ -1,15 +1,82 @@
-from functools import wraps
+from datetime import datetime, timedelta
+from functools import lru_cache, wraps
 from flask import redirect, url_for, flash
 from flask_login import current_user
+from sqlalchemy import func
+from .models import VehicleEvent
 def require_role(role):
     def decorator(fn):
         @wraps(fn)
         def wrapper(*args, **kwargs):
-            if not current_user.is_authenticated:
-                return redirect(url_for('auth.login'))
-            if current_user.role != role:
+            # Resolve the LocalProxy once rather than on every attribute access
+            user = current_user._get_current_object()
+            # Anonymous users have no role (LOGIN_DISABLED, or no @login_required above)
+            if getattr(user, 'role', None) != role:
                 flash('Permission denied', 'error')
                 return redirect(url_for('main.dashboard'))
             return fn(*args, **kwargs)
         return wrapper
     return decorator
+
+
+@lru_cache(maxsize=1024)
+def parse_iso_date(s):
+    """Parse an ISO date/datetime filter string; None for empty or invalid input."""
+    # Filter strings repeat across dashboard refreshes, so parses are memoized
+    if not s:
+        return None
+    try:
+        return datetime.fromisoformat(s.replace('Z', '+00:00'))
+    except ValueError:
+        try:
+            return datetime.fromisoformat(s)
+        except ValueError:
+            return None
+
+def _build_event_query(args, base_q=None, default_today=False, filter_role=True):
+    """
+    Apply the dashboard's event filters from `args` (request.args) to `base_q`,
+    which may be an ORM query or a Core `select()` over VehicleEvent columns.
+
+    `vehicle` matches any part of the plate; `prefix=true` narrows it to a prefix match.
+    Returns (query, date_from, date_to); the dates are naive, with a midnight
+    `date_to` widened to the end of that day. With `default_today` and no date
+    filters, the query is limited to today.
+    """
+    q = VehicleEvent.query if base_q is None else base_q
+    v = (args.get('vehicle') or '').strip().upper()
+    if v:
+        if (args.get('prefix') or '').lower() == 'true':
+            # Opt-in prefix search, served by the upper(vehicle_number) pattern index on Postgres
+            q = q.filter(func.upper(VehicleEvent.vehicle_number).like(f"{v}%"))
+        else:
+            # Default substring search, which is what the dashboard's search box expects
+            q = q.filter(VehicleEvent.vehicle_number.ilike(f"%{v}%"))
+    status = args.get('status')
+    if status in ('IN','OUT'): q = q.filter(VehicleEvent.status==status)
+    auth = args.get('authorized')
+    if auth is not None: q = q.filter(VehicleEvent.is_authorized==(auth.lower()=='true'))
+    role = args.get('role')
+    if role and filter_role: q = q.filter(VehicleEvent.authorized_as==role)
+    vehicle_type = args.get('vehicle_type')
+    if vehicle_type: q = q.filter(VehicleEvent.vehicle_type==vehicle_type)
+    df = args.get('date_from'); dt = args.get('date_to')
+    if default_today and not df and not dt:
+        today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        # Half-open [midnight, next midnight) range: one bounded index scan, no end-of-day microseconds
+        q = q.filter(VehicleEvent.time_stamp >= today_start,
+                     VehicleEvent.time_stamp < today_start + timedelta(days=1))
+        return q, None, None
+    dfrom = parse_iso_date(df)
+    dto = parse_iso_date(dt)
+    if dfrom:
+        if dfrom.tzinfo:
+            dfrom = dfrom.replace(tzinfo=None)
+        q = q.filter(VehicleEvent.time_stamp >= dfrom)
+    if dto:
+        if dto.tzinfo:
+            dto = dto.replace(tzinfo=None)
+        if dto.hour == 0 and dto.minute == 0 and dto.second == 0:
+            dto = dto.replace(hour=23, minute=59, second=59, microsecond=999999)
+        q = q.filter(VehicleEvent.time_stamp <= dto)
+    return q, dfrom, dto
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import time
+from threading import Lock
+from typing import Dict, Optional
+
+from .models import Whitelist
+
+
+class WhitelistCache:
+    """
+    In-process {plate: authorized_as} map of the whitelist table.
+
+    Loaded lazily on first lookup; routes that change the whitelist call
+    `clear()` after committing, and a TTL bounds staleness from writes made
+    by other processes.
+    """
+
+    def __init__(self, ttl_seconds: float = 60.0):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Optional[Dict[str, str]] = None
+        self._loaded_at = 0.0
+        self._lock = Lock()
+
+    def get(self, plate: str) -> Optional[str]:
+        with self._lock:
+            if self._entries is None or time.monotonic() - self._loaded_at > self.ttl_seconds:
+                rows = Whitelist.query.with_entities(Whitelist.vehicle_number, Whitelist.authorized_as).all()
+                self._entries = dict(rows)
+                self._loaded_at = time.monotonic()
+            return self._entries.get(plate)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = None
+
+
+whitelist_cache = WhitelistCache()
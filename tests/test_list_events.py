@@ -0,0 +1,85 @@
+import os
+from datetime import datetime, timedelta
+
+# Config reads DATABASE_URL at import time, so point it at an in-memory database first
+os.environ["DATABASE_URL"] = "sqlite://"
+
+import pytest
+from sqlalchemy import event
+
+from app import create_app
+from app.extensions import db
+from app.models import User, VehicleEvent
+
+
+@pytest.fixture
+def client():
+    app = create_app()
+    app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+    with app.app_context():
+        now = datetime.now()
+        db.session.add_all(
+            VehicleEvent(
+                vehicle_number=f"MH 12 AB {i:04d}",
+                time_stamp=now - timedelta(minutes=i),
+                status="IN",
+                authorized_as="Staff" if i % 2 else "Unauthorized",
+                is_authorized=bool(i % 2),
+                confidence=80,
+            )
+            for i in range(10)
+        )
+        db.session.commit()
+        admin_id = db.session.query(User.id).filter_by(username="admin").scalar()
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session["_user_id"] = str(admin_id)
+        yield client
+        db.session.remove()
+        db.drop_all()
+
+
+def test_list_events_serializes_with_a_single_event_query(client):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", count)
+    try:
+        response = client.get("/api/events?date_from=2000-01-01")
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count)
+
+    assert response.status_code == 200
+    assert len(response.get_json()) == 10
+    # One SELECT for all rows; a lazy load in make_event_dict would add one per event
+    event_queries = [s for s in statements if "vehicle_event" in s]
+    assert len(event_queries) == 1, event_queries
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("vehicle=12 AB", 10),  # default: substring, as the dashboard search box sends it
+        ("vehicle=ab 0003", 1),
+        ("vehicle=12 AB&prefix=true", 0),
+        ("vehicle=mh 12 ab 000&prefix=true", 10),
+        ("vehicle=MH 12 AB 0003&prefix=true", 1),
+    ],
+)
+def test_list_events_vehicle_search(client, query, expected):
+    response = client.get(f"/api/events?date_from=2000-01-01&{query}")
+
+    assert response.status_code == 200
+    assert len(response.get_json()) == expected
+
+
+def test_require_role_denies_anonymous_user_without_error(client):
+    client.application.config["LOGIN_DISABLED"] = True
+    anonymous = client.application.test_client()
+
+    response = anonymous.get("/api/events/export.csv")
+
+    assert response.status_code == 302
+    assert response.headers["Location"].endswith("/")